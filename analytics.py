@@ -0,0 +1,302 @@
+"""Analytics - Columnar reports over department data.
+
+Manager state is exported into array-backed columns: integer columns use the
+stdlib ``array`` type and text columns are dictionary-encoded into integer
+codes with a label list. Filters and group-bys then run as whole-column
+operations (``map`` with ``operator`` functions, ``itertools.compress`` and
+``collections.Counter``), or as NumPy array operations when NumPy is
+installed.
+"""
+
+import operator
+from array import array
+from collections import Counter
+from datetime import date
+from functools import cached_property
+from itertools import chain, compress, groupby, repeat
+from typing import TYPE_CHECKING, Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+if TYPE_CHECKING:
+    from department_manager import DepartmentManager
+
+HAVE_NUMPY = np is not None
+
+TENURE_BUCKETS = ["< 1 year", "1-2 years", "3-4 years", "5+ years", "Unknown"]
+_TENURE_LIMITS = [1, 3, 5]  # Upper bounds (exclusive) in whole years
+
+
+class Frame:
+    """Equal-length integer columns; dictionary-encoded columns carry labels."""
+
+    def __init__(self, columns: dict, labels: Optional[dict[str, list]] = None,
+                 use_numpy: Optional[bool] = None):
+        """Create a frame from integer sequences keyed by column name."""
+        self.use_numpy = HAVE_NUMPY if use_numpy is None else use_numpy and HAVE_NUMPY
+        self.columns = {name: self._column(values) for name, values in columns.items()}
+        self.labels = labels or {}
+        self.length = len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def _column(self, values):
+        """Store values in the backend's array type."""
+        if self.use_numpy:
+            return np.asarray(values, dtype=np.int64)
+        return values if isinstance(values, array) else array('q', values)
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return self.length
+
+    def __getitem__(self, name: str):
+        """Column by name."""
+        return self.columns[name]
+
+    def _code(self, name: str, value) -> int:
+        """Integer code of a value in a column (-1 if the label is unknown)."""
+        labels = self.labels.get(name)
+        if labels is None:
+            return value
+        try:
+            return labels.index(value)
+        except ValueError:
+            return -1
+
+    # Filters
+    def where(self, name: str, value):
+        """Row mask for column == value."""
+        column, code = self.columns[name], self._code(name, value)
+        if self.use_numpy:
+            return column == code
+        return array('b', map(operator.eq, column, repeat(code)))
+
+    def where_not(self, name: str, value):
+        """Row mask for column != value."""
+        column, code = self.columns[name], self._code(name, value)
+        if self.use_numpy:
+            return column != code
+        return array('b', map(operator.ne, column, repeat(code)))
+
+    def both(self, mask, other):
+        """Combine two row masks with logical and."""
+        if self.use_numpy:
+            return mask & other
+        return array('b', map(operator.and_, mask, other))
+
+    def count(self, mask) -> int:
+        """Number of rows selected by a mask."""
+        return int(mask.sum()) if self.use_numpy else sum(mask)
+
+    def filter(self, mask) -> 'Frame':
+        """New frame with the rows selected by a mask."""
+        if self.use_numpy:
+            columns = {name: column[mask] for name, column in self.columns.items()}
+        else:
+            columns = {name: array('q', compress(column, mask)) for name, column in self.columns.items()}
+        return Frame(columns, self.labels, self.use_numpy)
+
+    def rows(self, mask) -> list[int]:
+        """Row indices selected by a mask."""
+        if self.use_numpy:
+            return np.flatnonzero(mask).tolist()
+        return list(compress(range(self.length), mask))
+
+    # Group-by
+    def _cardinality(self, name: str) -> int:
+        """Number of distinct codes a column can hold."""
+        if name in self.labels:
+            return len(self.labels[name])
+        column = self.columns[name]
+        return int(column.max()) + 1 if self.use_numpy and len(column) else max(column, default=-1) + 1
+
+    def _label(self, name: str, code: int):
+        """Label for a code in a column."""
+        labels = self.labels.get(name)
+        return labels[code] if labels is not None else code
+
+    def group_count(self, *names: str) -> dict:
+        """Row counts per distinct combination of the given columns.
+
+        Keys are labels for a single column and tuples of labels otherwise.
+        """
+        sizes = [self._cardinality(name) for name in names]
+        # Fold the code columns into one combined key column
+        key = self.columns[names[0]]
+        for name, size in zip(names[1:], sizes[1:]):
+            if self.use_numpy:
+                key = key * size + self.columns[name]
+            else:
+                key = array('q', map(operator.add, map(operator.mul, key, repeat(size)), self.columns[name]))
+
+        if self.use_numpy:
+            counts = np.bincount(key, minlength=1) if len(key) else []
+            pairs = ((int(k), int(n)) for k, n in enumerate(counts) if n)
+        else:
+            pairs = Counter(key).items()
+
+        result = {}
+        for combined, n in pairs:
+            codes = []
+            for size in reversed(sizes[1:]):
+                combined, code = divmod(combined, size)
+                codes.append(code)
+            codes.append(combined)
+            labels = tuple(self._label(name, code) for name, code in zip(names, reversed(codes)))
+            result[labels[0] if len(names) == 1 else labels] = n
+        return result
+
+    def group_rows(self, name: str) -> dict:
+        """Row indices per distinct value of a column, in code order."""
+        column = self.columns[name]
+        if self.use_numpy:
+            order = np.argsort(column, kind='stable')
+            codes, starts = np.unique(column[order], return_index=True)
+            return {self._label(name, int(code)): rows.tolist()
+                    for code, rows in zip(codes, np.split(order, starts[1:]))}
+        # A stable sort by code keeps the rows of each group in order
+        rows = sorted(range(self.length), key=column.__getitem__)
+        return {self._label(name, code): list(group)
+                for code, group in groupby(rows, key=column.__getitem__)}
+
+
+def encode(values: Iterable[str]) -> tuple[array, list[str]]:
+    """Dictionary-encode text values into codes and a label list."""
+    values = values if isinstance(values, list) else list(values)
+    labels = list(dict.fromkeys(values))
+    index = dict(zip(labels, range(len(labels))))
+    return array('q', map(index.__getitem__, values)), labels
+
+
+def tenure_bucket(hire_date: str, today: date) -> int:
+    """Index into TENURE_BUCKETS for a hire date string."""
+    try:
+        hired = date.fromisoformat(hire_date)
+    except (TypeError, ValueError):
+        return len(TENURE_BUCKETS) - 1
+    years = (today - hired).days // 365
+    for bucket, limit in enumerate(_TENURE_LIMITS):
+        if years < limit:
+            return bucket
+    return len(_TENURE_LIMITS)
+
+
+class DepartmentAnalytics:
+    """Columnar snapshot of a DepartmentManager with vectorized reports."""
+
+    def __init__(self, manager: 'DepartmentManager', use_numpy: Optional[bool] = None,
+                 today: Optional[date] = None):
+        """Export the manager's employees and projects into columns.
+
+        Columns are built with C-level iteration (``map``, ``attrgetter``);
+        the exploded skill and technology frames are only built when a
+        breakdown report first needs them.
+        """
+        today = today or date.today()
+        self.use_numpy = use_numpy
+        self.employee_records = manager.list_employees()
+        self.project_records = manager.list_projects()
+        employees, projects = self.employee_records, self.project_records
+        live_employees = set(map(operator.attrgetter('id'), employees))
+        live_projects = {project_id: project_id for project_id in map(operator.attrgetter('id'), projects)}
+
+        self._roles = encode(list(map(operator.attrgetter('role'), employees)))
+        # Hire dates repeat a lot, so bucket each distinct date only once
+        hire_dates, date_labels = encode(list(map(operator.attrgetter('hire_date'), employees)))
+        buckets = array('q', (tenure_bucket(d, today) for d in date_labels))
+        self.employees = Frame({
+            'id': array('q', map(operator.attrgetter('id'), employees)),
+            'role': self._roles[0],
+            'project': array('q', map(live_projects.get, map(operator.attrgetter('current_project'), employees),
+                                      repeat(0))),
+            'tenure': _take(buckets, hire_dates),
+        }, {'role': self._roles[1], 'tenure': TENURE_BUCKETS}, use_numpy)
+
+        self._statuses = encode(list(map(operator.attrgetter('status'), projects)))
+        self.projects = Frame({
+            'id': array('q', map(operator.attrgetter('id'), projects)),
+            'status': self._statuses[0],
+            # Counted like get_project_team: every live entry of the team list
+            'team_size': array('q', (sum(map(live_employees.__contains__, p.team_members)) for p in projects)),
+        }, {'status': self._statuses[1]}, use_numpy)
+
+    # Exploded list columns: one row per (record, skill/technology)
+    @cached_property
+    def skills(self) -> Frame:
+        """One row per (employee, skill) with the employee's role."""
+        rows, values = _explode(self.employee_records, 'skills')
+        skills, skill_labels = encode(values)
+        roles, role_labels = self._roles
+        return Frame({'skill': skills, 'role': _take(roles, rows)},
+                     {'skill': skill_labels, 'role': role_labels}, self.use_numpy)
+
+    @cached_property
+    def technologies(self) -> Frame:
+        """One row per (project, technology) with the project's status."""
+        rows, values = _explode(self.project_records, 'technologies')
+        technologies, tech_labels = encode(values)
+        statuses, status_labels = self._statuses
+        return Frame({'technology': technologies, 'status': _take(statuses, rows)},
+                     {'technology': tech_labels, 'status': status_labels}, self.use_numpy)
+
+    # Standard reports
+    def overview(self) -> dict[str, int]:
+        """Headline employee and project counts."""
+        assigned = self.employees.count(self.employees.where_not('project', 0))
+        return {
+            'total_employees': len(self.employees),
+            'assigned_employees': assigned,
+            'unassigned_employees': len(self.employees) - assigned,
+            'total_projects': len(self.projects),
+            'active_projects': self.projects.count(self.projects.where('status', "Active")),
+        }
+
+    def employees_by_role(self) -> dict:
+        """Employees grouped by role."""
+        return {role: [self.employee_records[row] for row in rows]
+                for role, rows in self.employees.group_rows('role').items()}
+
+    def projects_by_status(self) -> dict:
+        """Projects grouped by status."""
+        return {status: [self.project_records[row] for row in rows]
+                for status, rows in self.projects.group_rows('status').items()}
+
+    def team_sizes(self) -> dict[int, int]:
+        """Live team size of each project by project id."""
+        return dict(zip(map(int, self.projects.columns['id']), map(int, self.projects.columns['team_size'])))
+
+    def unassigned_employees(self) -> list:
+        """Employees without a current project."""
+        return [self.employee_records[row] for row in self.employees.rows(self.employees.where('project', 0))]
+
+    # Ad-hoc breakdowns
+    def skills_by_role(self) -> dict[tuple[str, str], int]:
+        """Number of employees per (role, skill)."""
+        return self.skills.group_count('role', 'skill')
+
+    def technologies_by_status(self) -> dict[tuple[str, str], int]:
+        """Number of projects per (status, technology)."""
+        return self.technologies.group_count('status', 'technology')
+
+    def tenure_distribution(self) -> dict[str, int]:
+        """Number of employees per tenure bucket."""
+        counts = self.employees.group_count('tenure')
+        return {bucket: counts[bucket] for bucket in TENURE_BUCKETS if bucket in counts}
+
+    def team_size_distribution(self) -> dict[int, int]:
+        """Number of projects per team size."""
+        return dict(sorted(self.projects.group_count('team_size').items()))
+
+
+def _explode(records: list, name: str) -> tuple[list[int], list]:
+    """Row numbers and items of a list field, one entry per item."""
+    lists = list(map(operator.attrgetter(name), records))
+    rows = list(chain.from_iterable(map(repeat, range(len(lists)), map(len, lists))))
+    return rows, list(chain.from_iterable(lists))
+
+
+def _take(column: array, indices: Sequence[int]) -> array:
+    """Gather column values at the given row indices."""
+    return array('q', map(column.__getitem__, indices))
@@ -0,0 +1,103 @@
+"""Benchmark the columnar reports against the original loop-based reports.
+
+Runs every standard report plus the skills-by-role breakdown over managers of
+increasing size. The one-off export into columns is timed separately from
+the reports that run over it; the snapshot is cached until the data changes,
+so later reports only pay the report time. The "first" column is export plus
+reports on a fresh snapshot, as right after a change. Run from the project directory:
+
+    python benchmarks/bench_analytics.py
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics import HAVE_NUMPY, DepartmentAnalytics  # noqa: E402
+from bench_persistence import build_manager  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+REPEAT = 5
+ROLES = ["Developer", "QA", "Manager", "Designer", "DevOps"]
+SKILLS = ["Python", "Go", "SQL", "React", "Docker", "Kubernetes"]
+
+
+def loop_reports(manager):
+    """The reports as originally written, with Python loops over employees."""
+    employees = manager.list_employees()
+    projects = manager.list_projects()
+
+    assigned = sum(1 for emp in employees if emp.current_project)
+    active_projects = sum(1 for proj in projects if proj.status == "Active")
+
+    roles = {}
+    for emp in employees:
+        if emp.role not in roles:
+            roles[emp.role] = []
+        roles[emp.role].append(emp)
+
+    statuses = {}
+    for proj in projects:
+        if proj.status not in statuses:
+            statuses[proj.status] = []
+        statuses[proj.status].append(proj)
+
+    unassigned = [emp for emp in employees if not emp.current_project]
+
+    skills_by_role = {}
+    for emp in employees:
+        for skill in emp.skills:
+            skills_by_role[(emp.role, skill)] = skills_by_role.get((emp.role, skill), 0) + 1
+    return assigned, active_projects, roles, statuses, unassigned, skills_by_role
+
+
+def columnar_reports(analytics):
+    """The same reports over an exported DepartmentAnalytics snapshot."""
+    return (analytics.overview(), analytics.employees_by_role(), analytics.projects_by_status(),
+            analytics.unassigned_employees(), analytics.skills_by_role())
+
+
+def first_reports(manager, use_numpy):
+    """Export a fresh snapshot and run the reports over it."""
+    return columnar_reports(DepartmentAnalytics(manager, use_numpy))
+
+
+def timed(func, *args) -> float:
+    """Median wall time of func in milliseconds."""
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    backends = [("array", False)] + ([("numpy", True)] if HAVE_NUMPY else [])
+    header = f"{'employees':>10} {'loops ms':>10}"
+    for name, _ in backends:
+        header += f" {name + ' export ms':>16} {name + ' reports ms':>17} {name + ' first ms':>15}"
+    print(header)
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = build_manager(Path(tmp) / "data.json", size)
+            for i, employee in enumerate(manager.list_employees()):
+                employee.role = ROLES[i % len(ROLES)]
+                employee.skills = SKILLS[i % 3:i % 3 + 3]
+            row = f"{size:>10} {timed(loop_reports, manager):>10.2f}"
+            for _, use_numpy in backends:
+                export = timed(DepartmentAnalytics, manager, use_numpy)
+                analytics = DepartmentAnalytics(manager, use_numpy)
+                first = timed(first_reports, manager, use_numpy)
+                row += f" {export:>16.2f} {timed(columnar_reports, analytics):>17.2f} {first:>15.2f}"
+            print(row)
+    if not HAVE_NUMPY:
+        print("\nNumPy is not installed; only the stdlib array backend was measured.")
+
+
+if __name__ == "__main__":
+    main()
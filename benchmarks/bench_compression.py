@@ -0,0 +1,58 @@
+"""Benchmark compressed data files: CPU time against I/O time.
+
+For each codec and data size this measures save and load CPU time, the file
+size, and the time the file would take to transfer over slow storage (a
+network mount at BANDWIDTH_MB_S). Compression pays off when the I/O time it
+saves exceeds the CPU time it costs. Run from the project directory:
+
+    python benchmarks/bench_compression.py
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import storage  # noqa: E402
+from bench_persistence import build_manager  # noqa: E402
+
+SIZES = [1_000, 10_000, 50_000]
+EXTENSIONS = [".json", ".json.gz", ".json.bz2", ".json.xz"]
+BANDWIDTH_MB_S = 10
+REPEAT = 3
+
+
+def cpu_time(func, *args) -> float:
+    """Median process CPU time of func in milliseconds."""
+    samples = []
+    for _ in range(REPEAT):
+        start = time.process_time()
+        func(*args)
+        samples.append((time.process_time() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    print(f"I/O time assumes {BANDWIDTH_MB_S} MB/s storage\n")
+    print(f"{'employees':>10} {'codec':>6} {'size KB':>9} {'save cpu ms':>12} {'load cpu ms':>12} "
+          f"{'io ms':>8} {'save+io ms':>11} {'load+io ms':>11}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            for extension in EXTENSIONS:
+                data_file = Path(tmp) / f"data{extension}"
+                manager = build_manager(data_file, size)
+                manager.backups = 0
+                save = cpu_time(manager.save_data)
+                load = cpu_time(storage.read_document, data_file, 0)
+                size_kb = data_file.stat().st_size / 1024
+                io_ms = size_kb / 1024 / BANDWIDTH_MB_S * 1000
+                codec = extension.rsplit(".", 1)[-1] if extension != ".json" else "none"
+                print(f"{size:>10} {codec:>6} {size_kb:>9.0f} {save:>12.1f} {load:>12.1f} "
+                      f"{io_ms:>8.1f} {save + io_ms:>11.1f} {load + io_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
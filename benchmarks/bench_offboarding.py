@@ -0,0 +1,65 @@
+"""Benchmark mass offboarding with soft deletes and compaction.
+
+Removes a share of the employees and projects one by one, either permanently
+(unlinking each from its team right away) or as tombstones, then as
+tombstones in one batch, and times the single compaction pass that purges
+the tombstones. Run from the project directory:
+
+    python benchmarks/bench_offboarding.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_persistence import build_manager  # noqa: E402
+
+SIZES = [1_000, 10_000]
+SHARE = 0.2  # Fraction of employees and projects removed
+
+
+def offboard(data_file: Path, size: int, mode: str) -> tuple[float, float]:
+    """Remove records (mode: permanent, soft or batch); returns removal and compaction ms."""
+    manager = build_manager(data_file, size)
+    manager.compact_threshold = 0  # Compact explicitly below
+    manager.save_data()
+    employee_ids = list(manager.employees)[::int(1 / SHARE)]
+    project_ids = list(manager.projects)[::int(1 / SHARE)]
+
+    start = time.perf_counter()
+    if mode == "batch":
+        manager.remove_employees(employee_ids)
+        manager.remove_projects(project_ids)
+    else:
+        for employee_id in employee_ids:
+            manager.remove_employee(employee_id, permanent=mode == "permanent")
+        for project_id in project_ids:
+            manager.remove_project(project_id, permanent=mode == "permanent")
+    removed = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    manager.compact()
+    compacted = (time.perf_counter() - start) * 1000
+    assert manager.verify_integrity().ok
+    return removed, compacted
+
+
+def main():
+    print(f"{'employees':>10} {'removed':>8} {'permanent ms':>13} {'soft ms':>9} {'batch ms':>9} "
+          f"{'compact ms':>11}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            permanent, _ = offboard(tmp / "permanent.json", size, "permanent")
+            soft, _ = offboard(tmp / "soft.json", size, "soft")
+            batch, compacted = offboard(tmp / "batch.json", size, "batch")
+            removed = int(size * SHARE) + int(max(1, size // 10) * SHARE)
+            print(f"{size:>10} {removed:>8} {permanent:>13.1f} {soft:>9.1f} {batch:>9.1f} "
+                  f"{compacted:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark the per-save cost of durable persistence.
+
+Compares in-place saves that truncate the data file and write it directly
+against ``DepartmentManager.save_data`` (temp file, checksum, fsync, rename,
+backups) at several data sizes. The original save used ``json.dump`` with
+indentation; the in-place save uses the same encoder as ``save_data``, so
+the overhead column is the cost of durability alone. Every record is marked
+dirty before each timed save so all records are encoded; the last column is
+a durable save that reuses the cached record encodings, as after a single
+change. Run from the project directory:
+
+    python benchmarks/bench_persistence.py
+"""
+
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from department_manager import DepartmentManager  # noqa: E402
+from models import Employee, Project  # noqa: E402
+
+SIZES = [100, 1_000, 10_000]
+REPEAT = 7
+
+
+def build_manager(data_file: Path, employees: int) -> DepartmentManager:
+    """Create a manager holding the given number of employees."""
+    manager = DepartmentManager(str(data_file))
+    projects = max(1, employees // 10)
+    for pid in range(1, projects + 1):
+        manager.projects[pid] = Project(id=pid, name=f"Project {pid}", description="Benchmark project",
+                                        technologies=["Python", "SQL"])
+    for eid in range(1, employees + 1):
+        pid = eid % projects + 1
+        manager.employees[eid] = Employee(id=eid, name=f"Employee {eid}", role="Developer",
+                                          email=f"employee{eid}@example.com",
+                                          skills=["Python", "Git"], current_project=pid)
+        manager.projects[pid].team_members.append(eid)
+    manager.next_employee_id = employees + 1
+    manager.next_project_id = projects + 1
+    return manager
+
+
+def mark_all_dirty(manager: DepartmentManager):
+    """Make the next save re-encode every record."""
+    for records in (manager.employees, manager.projects):
+        for record in records.values():
+            record.mark_dirty()
+
+
+def original_save(manager: DepartmentManager, data_file: Path):
+    """The original save: truncate in place and dump."""
+    data = {
+        'next_employee_id': manager.next_employee_id,
+        'next_project_id': manager.next_project_id,
+        'employees': {str(k): v.to_dict() for k, v in manager.employees.items()},
+        'projects': {str(k): v.to_dict() for k, v in manager.projects.items()}
+    }
+    with open(data_file, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def in_place_save(manager: DepartmentManager, data_file: Path):
+    """Truncate in place and write with the save_data encoder."""
+    mark_all_dirty(manager)
+    with open(data_file, 'w', encoding='utf-8') as f:
+        f.writelines(manager._encode_data())
+
+
+def durable_save(manager: DepartmentManager):
+    """A durable save that re-encodes every record."""
+    mark_all_dirty(manager)
+    manager.save_data()
+
+
+def timed(func, *args) -> float:
+    """Median wall time of func in milliseconds."""
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    print(f"{'employees':>10} {'original ms':>12} {'in-place ms':>12} {'durable ms':>11} "
+          f"{'overhead ms':>12} {'ratio':>7} {'cached ms':>10}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            manager = build_manager(tmp / "durable.json", size)
+            original = timed(original_save, manager, tmp / "original.json")
+            in_place = timed(in_place_save, manager, tmp / "in_place.json")
+            durable = timed(durable_save, manager)
+            cached = timed(manager.save_data)
+            print(f"{size:>10} {original:>12.2f} {in_place:>12.2f} {durable:>11.2f} "
+                  f"{durable - in_place:>12.2f} {durable / in_place:>6.2f}x {cached:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark capacity planning queries against full scans of all projects.
+
+Gives every project a few months somewhere in a five-year window, then asks
+who with a given skill is free during one month and what the peak headcount
+per month is over one quarter. The scan versions parse every project's dates
+on each query; the planner builds its interval tree once (timed separately)
+and only visits the overlapping projects. Run from the project directory:
+
+    python benchmarks/bench_planning.py
+"""
+
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_persistence import build_manager  # noqa: E402
+from planning import CapacityPlanner, months, parse_date  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+REPEAT = 5
+SKILLS = ["Python", "Go", "SQL", "React", "Docker", "Kubernetes"]
+FIRST_DAY = date(2024, 1, 1)
+WINDOW = (date(2026, 3, 1), date(2026, 3, 31))
+QUARTER = (date(2026, 4, 1), date(2026, 6, 30))
+
+
+def scan_free(manager, start: date, end: date, skill: str) -> list:
+    """Free employees with a skill, scanning every project."""
+    busy = set()
+    for project in manager.list_projects():
+        project_start = parse_date(project.start_date)
+        project_end = parse_date(project.end_date, end=True) if project.end_date else date.max
+        if project_start is None or project_end is None or (project_start <= end and project_end >= start):
+            busy.update(project.team_members)
+    return [e for e in manager.list_employees() if skill in e.skills and e.id not in busy]
+
+
+def scan_peaks(manager, start: date, end: date) -> dict:
+    """Peak headcount per month, scanning every project day by day."""
+    peaks = {}
+    for month in months(start, end):
+        following = (month + timedelta(days=32)).replace(day=1)
+        daily = [0] * (following - month).days
+        for project in manager.list_projects():
+            project_start = parse_date(project.start_date)
+            project_end = parse_date(project.end_date, end=True)
+            if project_start is None or project_end is None:
+                continue
+            first = max(project_start, month)
+            last = min(project_end, following - timedelta(days=1))
+            for offset in range((first - month).days, (last - month).days + 1):
+                daily[offset] += len(project.team_members)
+        peaks[month.strftime("%Y-%m")] = max(daily)
+    return peaks
+
+
+def timed(func, *args) -> float:
+    """Median wall time of func in milliseconds."""
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    print(f"{'employees':>10} {'build ms':>9} {'scan free ms':>13} {'planner free ms':>16} "
+          f"{'scan peak ms':>13} {'planner peak ms':>16}")
+    rng = random.Random(42)
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = build_manager(Path(tmp) / "data.json", size)
+            for i, employee in enumerate(manager.list_employees()):
+                employee.skills = SKILLS[i % 3:i % 3 + 3]
+            for project in manager.list_projects():
+                start = FIRST_DAY + timedelta(days=rng.randrange(5 * 365))
+                project.start_date = start.isoformat()
+                project.end_date = (start + timedelta(days=rng.randrange(60, 180))).isoformat()
+
+            build = timed(CapacityPlanner, manager)
+            planner = CapacityPlanner(manager)
+            assert ({e.id for e in planner.free_employees(*WINDOW, "Go")}
+                    == {e.id for e in scan_free(manager, *WINDOW, "Go")})
+            assert planner.peak_headcount_by_month(*QUARTER) == scan_peaks(manager, *QUARTER)
+            print(f"{size:>10} {build:>9.2f} "
+                  f"{timed(scan_free, manager, *WINDOW, 'Go'):>13.2f} "
+                  f"{timed(planner.free_employees, *WINDOW, 'Go'):>16.2f} "
+                  f"{timed(scan_peaks, manager, *QUARTER):>13.2f} "
+                  f"{timed(planner.peak_headcount_by_month, *QUARTER):>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
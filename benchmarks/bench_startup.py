@@ -0,0 +1,89 @@
+"""Benchmark application start-up.
+
+Reports the cumulative import time of ``main`` from ``python -X importtime``
+and, for data files of several sizes, the time until the first menu prompt
+is shown and the time until the first report (which needs the loaded data)
+is printed. Run from the project directory:
+
+    python benchmarks/bench_startup.py
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_persistence import build_manager  # noqa: E402
+
+SIZES = [0, 1_000, 10_000]
+REPEAT = 5
+PROMPT = b"Select an option: "
+
+
+def import_time() -> list[tuple[int, str]]:
+    """Cumulative import time in microseconds for main and its slowest imports."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings.append((int(cumulative), name.strip()))
+    return sorted(timings, reverse=True)
+
+
+def read_until(stream, marker: bytes) -> bytes:
+    """Read from a pipe until marker has been seen."""
+    data = b""
+    while marker not in data:
+        chunk = os.read(stream.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError(f"process exited before printing {marker!r}")
+        data += chunk
+    return data
+
+
+def time_to_prompt(cwd: Path) -> tuple[float, float]:
+    """Milliseconds until the first prompt and until the overview report."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-u", str(ROOT / "main.py")], cwd=cwd,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        read_until(process.stdout, PROMPT)
+        first_prompt = time.perf_counter() - start
+        process.stdin.write(b"4\n1\n")
+        process.stdin.flush()
+        read_until(process.stdout, b"Active Projects")
+        first_report = time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+    return first_prompt * 1000, first_report * 1000
+
+
+def main():
+    timings = import_time()
+    print("Import time (cumulative, -X importtime):")
+    for cumulative, name in timings[:8]:
+        print(f"  {cumulative / 1000:>8.2f} ms  {name}")
+
+    print(f"\n{'employees':>10} {'first prompt ms':>16} {'first report ms':>16}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            build_manager(tmp / "department_data.json", size).save_data()
+            samples = [time_to_prompt(tmp) for _ in range(REPEAT)]
+            prompt = statistics.median(s[0] for s in samples)
+            report = statistics.median(s[1] for s in samples)
+            print(f"{size:>10} {prompt:>16.1f} {report:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Change Feed - Change-data-capture events for department mutations.
+
+Every mutation in DepartmentManager publishes a ChangeEvent describing the
+entity, the changed fields and the record before and after the change.
+Subscribers are called on a background thread so a slow consumer never adds
+latency to the mutation itself. When a log path is given, events are also
+appended to a rotating JSONL changefeed with increasing sequence numbers, so
+consumers can resume from the last sequence number they processed.
+
+Events are logged before the change is saved, and the data file records the
+sequence number of the last event it includes. On load, logged events whose
+change never reached the data file (a crash in between) are discarded; events
+that could not be logged leave a hole in the sequence numbers, which
+read_since() reports as a ChangeFeedGap instead of skipping over it.
+"""
+
+import json
+import os
+import queue
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+Subscriber = Callable[['ChangeEvent'], None]
+
+
+class ChangeFeedGap(LookupError):
+    """Raised when events a consumer has not seen are missing from the log.
+
+    Either the cursor is older than the oldest event kept after rotation, or
+    an event could not be logged. The consumer has to resynchronize from the
+    current data instead of resuming from its cursor.
+    """
+
+    def __init__(self, expected: int, found: int):
+        """Record the first missing and the next available sequence number."""
+        super().__init__(f"Change feed events {expected} to {found - 1} are missing")
+        self.expected = expected
+        self.found = found
+
+
+@dataclass
+class ChangeEvent:
+    """A single change to an employee or project."""
+
+    seq: int
+    entity: str  # employee, project
+    entity_id: int
+    op: str  # create, update, delete, restore
+    changed_fields: list[str]
+    before: Optional[dict] = None
+    after: Optional[dict] = None
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+
+    def to_dict(self) -> dict:
+        """Convert event to dictionary for JSON serialization."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ChangeEvent':
+        """Create event from dictionary."""
+        return cls(**data)
+
+
+def snapshot(record) -> dict:
+    """Copy a record's fields so later in-place changes do not alter it."""
+    return {key: list(value) if isinstance(value, list) else value
+            for key, value in record.to_dict().items()}
+
+
+def changed_fields(before: Optional[dict], after: Optional[dict]) -> list[str]:
+    """Names of the fields that differ between two snapshots."""
+    before = before or {}
+    after = after or {}
+    return [key for key in {**before, **after} if before.get(key) != after.get(key)]
+
+
+class ChangeLog:
+    """Append-only JSONL changefeed rotated by size.
+
+    The current file is ``path``; rotated files are ``path.1`` (newest) to
+    ``path.<backups>`` (oldest).
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1_000_000, backups: int = 5):
+        """Open the changefeed at path."""
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def files(self) -> list[Path]:
+        """Existing changefeed files, oldest first."""
+        rotated = [self.path.with_name(f"{self.path.name}.{i}") for i in range(self.backups, 0, -1)]
+        return [p for p in rotated + [self.path] if p.exists()]
+
+    def last_seq(self) -> int:
+        """Sequence number of the newest event, or 0 if the feed is empty."""
+        for path in reversed(self.files()):
+            seq = _seq(_last_line(path))
+            if seq is not None:
+                return seq
+        return 0
+
+    def truncate_torn_line(self) -> bool:
+        """Cut off a partial last line left by a crash during append.
+
+        Every complete event ends with a newline, so a last line without one
+        was never fully written. Returns True if anything was removed.
+        """
+        if not self.path.exists():
+            return False
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return False
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return False
+            # Find the newline ending the last complete line
+            keep = 0
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline != -1:
+                    keep = start + newline + 1
+                    break
+                position = start
+            f.truncate(keep)
+        return True
+
+    def discard_after(self, seq: int) -> int:
+        """Remove the events with a sequence number above seq; returns how many."""
+        discarded = 0
+        for path in reversed(self.files()):
+            lines = path.read_text(encoding='utf-8').splitlines(keepends=True)
+            kept = [line for line in lines if (_seq(line) or 0) <= seq]
+            if len(kept) == len(lines):
+                break
+            discarded += len(lines) - len(kept)
+            path.write_text("".join(kept), encoding='utf-8')
+        return discarded
+
+    def append(self, event: ChangeEvent):
+        """Append an event, rotating the file when it grows too large."""
+        if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            self.rotate()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event.to_dict()) + "\n")
+
+    def rotate(self):
+        """Start a new changefeed file, discarding the oldest one."""
+        for index in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def read_since(self, cursor: int = 0) -> Iterator[ChangeEvent]:
+        """Yield the events with a sequence number greater than cursor.
+
+        Raises ChangeFeedGap on reaching a missing event, after yielding the
+        events before it.
+        """
+        expected = cursor + 1
+        for path in self.files():
+            last_seq = _seq(_last_line(path))
+            if last_seq is not None and last_seq <= cursor:
+                continue  # Already consumed
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn line from a crash during append
+                    if data['seq'] > cursor:
+                        if data['seq'] != expected:
+                            raise ChangeFeedGap(expected, data['seq'])
+                        expected += 1
+                        yield ChangeEvent.from_dict(data)
+
+
+def _seq(line: str) -> Optional[int]:
+    """Sequence number of a changefeed line, or None if it is empty or torn."""
+    try:
+        return json.loads(line)['seq'] if line else None
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return None
+
+
+def _last_line(path: Path, block_size: int = 4096) -> str:
+    """Read the last non-empty line of a file without reading all of it."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b""
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+            lines = data.strip().split(b"\n")
+            if len(lines) > 1 or start == 0:
+                return lines[-1].decode('utf-8')
+    return ""
+
+
+class ChangeFeed:
+    """Publishes change events to subscribers and an optional changefeed log."""
+
+    def __init__(self, log_path: Optional[str] = None, max_bytes: int = 1_000_000, backups: int = 5):
+        """Initialize the feed, resuming sequence numbers from the log if given."""
+        self.log = ChangeLog(log_path, max_bytes, backups) if log_path else None
+        if self.log:
+            self.log.truncate_torn_line()
+        self.seq = self.log.last_seq() if self.log else 0
+        self._subscribers: list[Subscriber] = []
+        self._sync_subscribers: list[Subscriber] = []
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def reconcile(self, saved_seq: int):
+        """Line the log up with a data file that includes events up to saved_seq.
+
+        Logged events after saved_seq were never saved and are discarded. If
+        the log ends before saved_seq, events were lost; numbering continues
+        after saved_seq so readers see the gap.
+        """
+        if not self.log:
+            return
+        with self._lock:
+            if self.seq > saved_seq:
+                discarded = self.log.discard_after(saved_seq)
+                print(f"Discarded {discarded} changefeed events that were never saved")
+            self.seq = saved_seq
+
+    def subscribe(self, callback: Subscriber, synchronous: bool = False) -> Callable[[], None]:
+        """Register a subscriber and return a function that unregisters it.
+
+        Synchronous subscribers are called inline by publish(); they are meant
+        for cheap in-process bookkeeping such as cache invalidation.
+        """
+        with self._lock:
+            if synchronous:
+                self._sync_subscribers.append(callback)
+            else:
+                self._subscribers.append(callback)
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._dispatch, name="changefeed", daemon=True)
+                    self._worker.start()
+
+        def unsubscribe():
+            with self._lock:
+                for subscribers in (self._subscribers, self._sync_subscribers):
+                    if callback in subscribers:
+                        subscribers.remove(callback)
+        return unsubscribe
+
+    def publish(self, entity: str, entity_id: int, op: str,
+                before: Optional[dict], after: Optional[dict]) -> Optional[ChangeEvent]:
+        """Record a change; returns None when nothing actually changed."""
+        fields = changed_fields(before, after)
+        if not fields:
+            return None
+
+        with self._lock:
+            self.seq += 1
+            event = ChangeEvent(self.seq, entity, entity_id, op, fields, before, after)
+            if self.log:
+                try:
+                    self.log.append(event)
+                except OSError as e:
+                    # Don't fail the change; its sequence number stays used, so
+                    # readers get a ChangeFeedGap instead of silently missing it
+                    print(f"Error writing changefeed event {event.seq}: {e}")
+            if self._subscribers:
+                self._queue.put(event)
+            sync_subscribers = list(self._sync_subscribers)
+        for callback in sync_subscribers:
+            callback(event)
+        return event
+
+    def read_since(self, cursor: int = 0) -> Iterator[ChangeEvent]:
+        """Yield logged events after cursor; requires a changefeed log."""
+        if not self.log:
+            raise ValueError("Change feed has no log to read from")
+        return self.log.read_since(cursor)
+
+    def flush(self):
+        """Block until every published event has been delivered."""
+        self._queue.join()
+
+    def _dispatch(self):
+        """Deliver queued events to subscribers (runs on the worker thread)."""
+        while True:
+            event = self._queue.get()
+            with self._lock:
+                subscribers = list(self._subscribers)
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"Error in change subscriber: {e}")
+            self._queue.task_done()
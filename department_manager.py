@@ -1,128 +1,344 @@
 """Department Manager - Core business logic for managing the software department."""
 
+import functools
 import json
-from typing import Optional, List
+import threading
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, List
 from pathlib import Path
 from models import Employee, Project
+from integrity import IntegrityReport, check_integrity, repair_integrity
+import storage
+from changefeed import ChangeEvent, ChangeFeed, snapshot
+from query import QueryEngine
+from planning import CapacityPlanner, DateLike
+
+if TYPE_CHECKING:
+    from analytics import DepartmentAnalytics
+
+
+def synchronized(method):
+    """Run a manager method while holding the manager's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _now(days_ago: int = 0) -> str:
+    """Local time days_ago days back, in the format tombstones are stamped with."""
+    return (datetime.now() - timedelta(days=days_ago)).isoformat(timespec="seconds")
+
+
+def _tombstones(entries: list) -> dict[int, str]:
+    """Tombstones from their saved [id, removal time] pairs.
+    
+    Older files list bare ids; those count as removed now, so they are kept
+    for the full retention period.
+    """
+    loaded = _now()
+    return dict(entry if isinstance(entry, list) else (entry, loaded) for entry in entries)
 
 
 class DepartmentManager:
     """Manages employees and projects in the software department."""
     
-    def __init__(self, data_file: str = "department_data.json"):
-        """Initialize the department manager."""
+    def __init__(self, data_file: str = "department_data.json",
+                 verify_on_load: bool = False, repair_on_load: bool = False,
+                 backups: int = 3, changefeed: Optional[str] = None,
+                 compact_threshold: int = 1000, tombstone_days: int = 30):
+        """Initialize the department manager.
+        
+        With verify_on_load the loaded data is checked for integrity problems;
+        with repair_on_load any problems found are also repaired and saved.
+        Each save keeps the previous `backups` versions of the data file.
+        Every mutation is published on `changes`; pass a changefeed path to
+        also append the events to a rotating JSONL log.
+        Removed records are tombstoned and kept for at least `tombstone_days`
+        days; once `compact_threshold` tombstones have piled up, removals
+        start a background compaction of the expired ones (0 to disable).
+        """
         self.data_file = Path(data_file)
+        self.backups = backups
         self.employees: dict[int, Employee] = {}
         self.projects: dict[int, Project] = {}
         self.next_employee_id = 1
         self.next_project_id = 1
+        self.deleted_employees: dict[int, str] = {}  # Id -> removal time, oldest first
+        self.deleted_projects: dict[int, str] = {}
+        self.compact_threshold = compact_threshold
+        self.tombstone_days = tombstone_days
+        self.lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+        self.load_error: Optional[Exception] = None
+        self.load_duplicates: list[tuple[str, int]] = []  # (entity, id) stored twice in the file
+        self.integrity_report: Optional[IntegrityReport] = None
+        self.changes = ChangeFeed(changefeed)
+        self._queries: Optional[QueryEngine] = None
+        self._planner: Optional[CapacityPlanner] = None
+        self._analytics: Optional['DepartmentAnalytics'] = None
+        self._analytics_subscribed = False
         self.load_data()
+        
+        if repair_on_load and not self.load_error:
+            self.integrity_report = self.repair_integrity()
+        elif verify_on_load and not self.load_error:
+            self.integrity_report = self.verify_integrity()
+        if self.integrity_report and not self.integrity_report.ok:
+            print(self.integrity_report)
     
     # Employee Management
-    def add_employee(self, name: str, role: str, email: str, skills: List[str]) -> Employee:
-        """Add a new employee to the department."""
+    @synchronized
+    def add_employee(self, name: str, role: str, email: str, skills: List[str],
+                     employee_id: Optional[int] = None) -> Employee:
+        """Add a new employee to the department.
+        
+        employee_id overrides the next free id, e.g. when ids are allocated
+        across several managers; it must not already be in use.
+        """
+        if employee_id is None:
+            employee_id = self.next_employee_id
+        elif employee_id in self.employees:
+            raise ValueError(f"Employee ID {employee_id} is already in use")
+        
         employee = Employee(
-            id=self.next_employee_id,
+            id=employee_id,
             name=name,
             role=role,
             email=email,
             skills=skills
         )
         self.employees[employee.id] = employee
-        self.next_employee_id += 1
+        self.next_employee_id = max(self.next_employee_id, employee.id + 1)
+        self.changes.publish("employee", employee.id, "create", None, snapshot(employee))
         self.save_data()
         return employee
     
     def get_employee(self, employee_id: int) -> Optional[Employee]:
         """Get an employee by ID."""
+        if employee_id in self.deleted_employees:
+            return None
         return self.employees.get(employee_id)
     
+    @synchronized
     def list_employees(self) -> List[Employee]:
         """List all employees."""
-        return list(self.employees.values())
+        if not self.deleted_employees:
+            return list(self.employees.values())
+        deleted = self.deleted_employees
+        return [e for emp_id, e in self.employees.items() if emp_id not in deleted]
     
+    @synchronized
     def update_employee(self, employee_id: int, **kwargs) -> bool:
         """Update employee information."""
         employee = self.get_employee(employee_id)
         if not employee:
             return False
         
+        before = snapshot(employee)
         for key, value in kwargs.items():
             if hasattr(employee, key) and value is not None:
                 setattr(employee, key, value)
+                employee.mark_dirty()
         
+        self.changes.publish("employee", employee_id, "update", before, snapshot(employee))
         self.save_data()
         return True
     
-    def remove_employee(self, employee_id: int) -> bool:
-        """Remove an employee from the department."""
+    @synchronized
+    def remove_employee(self, employee_id: int, permanent: bool = False) -> bool:
+        """Remove an employee from the department.
+        
+        The employee is tombstoned: hidden from lookups, lists and reports
+        until restore_employee() brings them back or compact() purges them.
+        With permanent the record is deleted and unlinked from its project
+        straight away.
+        """
+        if not permanent:
+            return self.remove_employees([employee_id]) == 1
         if employee_id not in self.employees:
             return False
+        employee = self.employees[employee_id]
         
         # Remove from any projects
-        employee = self.employees[employee_id]
+        project = None
         if employee.current_project:
-            project = self.get_project(employee.current_project)
+            project = self.projects.get(employee.current_project)
             if project and employee_id in project.team_members:
+                project_before = snapshot(project)
                 project.team_members.remove(employee_id)
+                project.mark_dirty()
+            else:
+                project = None
         
+        was_live = employee_id not in self.deleted_employees
         del self.employees[employee_id]
+        self.deleted_employees.pop(employee_id, None)
+        if project:
+            self.changes.publish("project", project.id, "update", project_before, snapshot(project))
+        if was_live:
+            self.changes.publish("employee", employee_id, "delete", snapshot(employee), None)
+        self.save_data()
+        return True
+    
+    @synchronized
+    def remove_employees(self, employee_ids: Iterable[int]) -> int:
+        """Tombstone several employees with a single save.
+        
+        Returns the number of employees removed; unknown ids are skipped.
+        """
+        removed = [self.employees[emp_id] for emp_id in dict.fromkeys(employee_ids)
+                   if self.get_employee(emp_id)]
+        if not removed:
+            return 0
+        
+        self.deleted_employees.update(dict.fromkeys((employee.id for employee in removed), _now()))
+        for employee in removed:
+            self.changes.publish("employee", employee.id, "delete", snapshot(employee), None)
+        self.save_data()
+        self._schedule_compaction()
+        return len(removed)
+    
+    @synchronized
+    def restore_employee(self, employee_id: int) -> bool:
+        """Undo the removal of an employee that has not been compacted yet."""
+        if employee_id not in self.deleted_employees:
+            return False
+        
+        employee = self.employees[employee_id]
+        if employee.current_project is not None and employee.current_project not in self.projects:
+            # Their project has been purged in the meantime
+            employee.current_project = None
+            employee.mark_dirty()
+        
+        del self.deleted_employees[employee_id]
+        self.changes.publish("employee", employee_id, "restore", None, snapshot(employee))
         self.save_data()
         return True
     
     # Project Management
-    def add_project(self, name: str, description: str, technologies: List[str], status: str = "Planning") -> Project:
-        """Add a new project."""
+    @synchronized
+    def add_project(self, name: str, description: str, technologies: List[str], status: str = "Planning",
+                    project_id: Optional[int] = None) -> Project:
+        """Add a new project.
+        
+        project_id overrides the next free id; it must not already be in use.
+        """
+        if project_id is None:
+            project_id = self.next_project_id
+        elif project_id in self.projects:
+            raise ValueError(f"Project ID {project_id} is already in use")
+        
         project = Project(
-            id=self.next_project_id,
+            id=project_id,
             name=name,
             description=description,
             technologies=technologies,
             status=status
         )
         self.projects[project.id] = project
-        self.next_project_id += 1
+        self.next_project_id = max(self.next_project_id, project.id + 1)
+        self.changes.publish("project", project.id, "create", None, snapshot(project))
         self.save_data()
         return project
     
     def get_project(self, project_id: int) -> Optional[Project]:
         """Get a project by ID."""
+        if project_id in self.deleted_projects:
+            return None
         return self.projects.get(project_id)
     
+    @synchronized
     def list_projects(self) -> List[Project]:
         """List all projects."""
-        return list(self.projects.values())
+        if not self.deleted_projects:
+            return list(self.projects.values())
+        deleted = self.deleted_projects
+        return [p for proj_id, p in self.projects.items() if proj_id not in deleted]
     
+    @synchronized
     def update_project(self, project_id: int, **kwargs) -> bool:
         """Update project information."""
         project = self.get_project(project_id)
         if not project:
             return False
         
+        before = snapshot(project)
         for key, value in kwargs.items():
             if hasattr(project, key) and value is not None:
                 setattr(project, key, value)
+                project.mark_dirty()
         
+        self.changes.publish("project", project_id, "update", before, snapshot(project))
         self.save_data()
         return True
     
-    def remove_project(self, project_id: int) -> bool:
-        """Remove a project."""
+    @synchronized
+    def remove_project(self, project_id: int, permanent: bool = False) -> bool:
+        """Remove a project.
+        
+        Like employees, projects are tombstoned unless permanent is set. The
+        team keeps pointing at a tombstoned project, so restore_project()
+        brings it back fully staffed; compact() unassigns them for good.
+        """
+        if not permanent:
+            return self.remove_projects([project_id]) == 1
         if project_id not in self.projects:
             return False
+        project = self.projects[project_id]
         
         # Unassign employees
-        project = self.projects[project_id]
+        unassigned = []
         for emp_id in project.team_members:
-            employee = self.get_employee(emp_id)
+            employee = self.employees.get(emp_id)
             if employee and employee.current_project == project_id:
+                unassigned.append((employee, snapshot(employee)))
                 employee.current_project = None
+                employee.mark_dirty()
         
+        was_live = project_id not in self.deleted_projects
         del self.projects[project_id]
+        self.deleted_projects.pop(project_id, None)
+        for employee, before in unassigned:
+            if employee.id not in self.deleted_employees:
+                self.changes.publish("employee", employee.id, "update", before, snapshot(employee))
+        if was_live:
+            self.changes.publish("project", project_id, "delete", snapshot(project), None)
+        self.save_data()
+        return True
+    
+    @synchronized
+    def remove_projects(self, project_ids: Iterable[int]) -> int:
+        """Tombstone several projects with a single save.
+        
+        Returns the number of projects removed; unknown ids are skipped.
+        """
+        removed = [self.projects[proj_id] for proj_id in dict.fromkeys(project_ids)
+                   if self.get_project(proj_id)]
+        if not removed:
+            return 0
+        
+        self.deleted_projects.update(dict.fromkeys((project.id for project in removed), _now()))
+        for project in removed:
+            self.changes.publish("project", project.id, "delete", snapshot(project), None)
+        self.save_data()
+        self._schedule_compaction()
+        return len(removed)
+    
+    @synchronized
+    def restore_project(self, project_id: int) -> bool:
+        """Undo the removal of a project that has not been compacted yet."""
+        if project_id not in self.deleted_projects:
+            return False
+        
+        del self.deleted_projects[project_id]
+        self.changes.publish("project", project_id, "restore", None, snapshot(self.projects[project_id]))
         self.save_data()
         return True
     
     # Assignment Management
+    @synchronized
     def assign_to_project(self, employee_id: int, project_id: int) -> bool:
         """Assign an employee to a project."""
         employee = self.get_employee(employee_id)
@@ -131,34 +347,59 @@ class DepartmentManager:
         if not employee or not project:
             return False
         
+        employee_before = snapshot(employee)
+        project_before = snapshot(project)
+        
         # Remove from previous project if assigned
-        if employee.current_project:
-            old_project = self.get_project(employee.current_project)
-            if old_project and employee_id in old_project.team_members:
-                old_project.team_members.remove(employee_id)
+        old_project = None
+        if employee.current_project and employee.current_project != project_id:
+            # Tombstoned projects are updated too, so a restore stays consistent
+            old_project = self.projects.get(employee.current_project)
+            if old_project:
+                old_project_before = snapshot(old_project)
+                if employee_id in old_project.team_members:
+                    old_project.team_members.remove(employee_id)
+                    old_project.mark_dirty()
         
         # Assign to new project
         employee.current_project = project_id
+        employee.mark_dirty()
         if employee_id not in project.team_members:
             project.team_members.append(employee_id)
+            project.mark_dirty()
         
+        if old_project and old_project.id not in self.deleted_projects:
+            self.changes.publish("project", old_project.id, "update", old_project_before, snapshot(old_project))
+        self.changes.publish("project", project_id, "update", project_before, snapshot(project))
+        self.changes.publish("employee", employee_id, "update", employee_before, snapshot(employee))
         self.save_data()
         return True
     
+    @synchronized
     def unassign_from_project(self, employee_id: int) -> bool:
         """Unassign an employee from their current project."""
         employee = self.get_employee(employee_id)
         if not employee or not employee.current_project:
             return False
         
-        project = self.get_project(employee.current_project)
+        employee_before = snapshot(employee)
+        project = self.projects.get(employee.current_project)
         if project and employee_id in project.team_members:
+            project_before = snapshot(project)
             project.team_members.remove(employee_id)
+            project.mark_dirty()
+        else:
+            project = None
         
         employee.current_project = None
+        employee.mark_dirty()
+        if project and project.id not in self.deleted_projects:
+            self.changes.publish("project", project.id, "update", project_before, snapshot(project))
+        self.changes.publish("employee", employee_id, "update", employee_before, snapshot(employee))
         self.save_data()
         return True
     
+    @synchronized
     def get_project_team(self, project_id: int) -> List[Employee]:
         """Get all employees assigned to a project."""
         project = self.get_project(project_id)
@@ -166,29 +407,200 @@ class DepartmentManager:
             return []
         
         return [self.employees[emp_id] for emp_id in project.team_members 
-                if emp_id in self.employees]
+                if emp_id in self.employees and emp_id not in self.deleted_employees]
+    
+    # Compaction
+    @synchronized
+    def compact(self, older_than_days: Optional[int] = None) -> tuple[int, int]:
+        """Purge tombstoned records and save once.
+        
+        With older_than_days only records removed more than that many days
+        ago are purged; by default every tombstone is. References to purged
+        records are fixed up in a single batched pass: purged employees leave
+        their teams and employees of purged projects are unassigned. Returns
+        the number of employees and projects purged.
+        """
+        cutoff = _now(older_than_days) if older_than_days is not None else None
+        purged_employees = {emp_id for emp_id, removed in self.deleted_employees.items()
+                            if cutoff is None or removed < cutoff}
+        purged_projects = {proj_id for proj_id, removed in self.deleted_projects.items()
+                           if cutoff is None or removed < cutoff}
+        if not purged_employees and not purged_projects:
+            return 0, 0
+        
+        for emp_id in purged_employees:
+            self.employees.pop(emp_id, None)
+            del self.deleted_employees[emp_id]
+        for proj_id in purged_projects:
+            self.projects.pop(proj_id, None)
+            del self.deleted_projects[proj_id]
+        
+        changed = []
+        if purged_employees:
+            for project in self.projects.values():
+                team = [emp_id for emp_id in project.team_members if emp_id not in purged_employees]
+                if len(team) != len(project.team_members):
+                    changed.append(("project", project, snapshot(project)))
+                    project.team_members = team
+                    project.mark_dirty()
+        if purged_projects:
+            for employee in self.employees.values():
+                if employee.current_project in purged_projects:
+                    changed.append(("employee", employee, snapshot(employee)))
+                    employee.current_project = None
+                    employee.mark_dirty()
+        
+        for entity, record, before in changed:
+            self.changes.publish(entity, record.id, "update", before, snapshot(record))
+        self.save_data()
+        return len(purged_employees), len(purged_projects)
+    
+    def _schedule_compaction(self):
+        """Start a background compaction of expired tombstones.
+        
+        Runs once enough tombstones have piled up and the oldest of them has
+        been kept for tombstone_days, so a freshly removed batch can always
+        be restored.
+        """
+        if not self.compact_threshold:
+            return
+        if len(self.deleted_employees) + len(self.deleted_projects) < self.compact_threshold:
+            return
+        cutoff = _now(self.tombstone_days)
+        if not any(deleted and next(iter(deleted.values())) < cutoff
+                   for deleted in (self.deleted_employees, self.deleted_projects)):
+            return
+        if self._compactor and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, args=(self.tombstone_days,),
+                                           name="compaction", daemon=True)
+        self._compactor.start()
+    
+    def wait_for_compaction(self):
+        """Block until a running background compaction has finished."""
+        if self._compactor:
+            self._compactor.join()
+    
+    # Change Data Capture
+    def subscribe(self, callback: Callable[[ChangeEvent], None], synchronous: bool = False) -> Callable[[], None]:
+        """Call callback with every change event; returns an unsubscribe function."""
+        return self.changes.subscribe(callback, synchronous)
+    
+    # Queries
+    def query(self, expression: str, entity: str = "employee") -> list:
+        """Employees (or projects) matching a query expression.
+        
+        See query.py for the syntax, e.g.
+        'role = "Developer" and project.status = "Active"'.
+        Raises QueryError for malformed queries.
+        """
+        return self._query_engine().run(expression, entity)
+    
+    def explain_query(self, expression: str, entity: str = "employee") -> List[str]:
+        """Describe the plan used to run a query."""
+        return self._query_engine().explain(expression, entity)
+    
+    def _query_engine(self) -> QueryEngine:
+        """Query engine, created on first use."""
+        if self._queries is None:
+            self._queries = QueryEngine(self)
+        return self._queries
+    
+    # Reports
+    def analytics(self) -> 'DepartmentAnalytics':
+        """Columnar snapshot for reports, reused until the data changes."""
+        with self.lock:
+            if self._analytics is None:
+                from analytics import DepartmentAnalytics  # Imported on first report
+                if not self._analytics_subscribed:
+                    self.subscribe(self._drop_analytics, synchronous=True)
+                    self._analytics_subscribed = True
+                self._analytics = DepartmentAnalytics(self)
+            return self._analytics
+    
+    def _drop_analytics(self, event: ChangeEvent):
+        """Discard the report snapshot after a change."""
+        self._analytics = None
+    
+    # Capacity Planning
+    def free_employees(self, start: DateLike, end: DateLike, skill: Optional[str] = None) -> List[Employee]:
+        """Employees not staffed on any project between two dates.
+        
+        Dates are YYYY-MM-DD (or YYYY-MM) strings or date objects; skill
+        limits the result to employees with that skill.
+        """
+        return self._capacity_planner().free_employees(start, end, skill)
+    
+    def peak_headcount_by_month(self, start: DateLike, end: DateLike) -> dict[str, int]:
+        """Peak number of concurrently staffed employees for each month."""
+        return self._capacity_planner().peak_headcount_by_month(start, end)
+    
+    def _capacity_planner(self) -> CapacityPlanner:
+        """Capacity planner, created on first use."""
+        with self.lock:
+            if self._planner is None:
+                self._planner = CapacityPlanner(self)
+            return self._planner
+    
+    # Data Integrity
+    @synchronized
+    def verify_integrity(self) -> IntegrityReport:
+        """Check employees and projects for referential integrity problems."""
+        return check_integrity(self)
+    
+    @synchronized
+    def repair_integrity(self) -> IntegrityReport:
+        """Repair referential integrity problems and save the result."""
+        return repair_integrity(self)
     
     # Data Persistence
+    @synchronized
     def save_data(self):
         """Save all data to JSON file."""
-        data = {
-            'next_employee_id': self.next_employee_id,
-            'next_project_id': self.next_project_id,
-            'employees': {str(k): v.to_dict() for k, v in self.employees.items()},
-            'projects': {str(k): v.to_dict() for k, v in self.projects.items()}
-        }
+        if self.load_error and self.data_file.exists():
+            # Never overwrite a file we failed to read; keep it for recovery
+            corrupt_file = self.data_file.with_name(self.data_file.name + ".corrupt")
+            self.data_file.replace(corrupt_file)
+            print(f"Unreadable data file moved to {corrupt_file}")
+        self.load_error = None
         
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        storage.write_document(self.data_file, self._encode_data(), self.backups)
     
-    def load_data(self):
-        """Load data from JSON file."""
-        if not self.data_file.exists():
-            return
+    def _encode_data(self) -> Iterator[str]:
+        """Yield the JSON document in chunks, one line per record.
         
+        Records cache their encoded text, so only records marked dirty since
+        the last save are re-encoded.
+        """
+        yield "{\n"
+        yield f'  "next_employee_id": {json.dumps(self.next_employee_id)},\n'
+        yield f'  "next_project_id": {json.dumps(self.next_project_id)},\n'
+        if self.changes.log:
+            yield f'  "changefeed_seq": {json.dumps(self.changes.seq)},\n'
+        yield f'  "deleted_employees": {json.dumps(list(self.deleted_employees.items()))},\n'
+        yield f'  "deleted_projects": {json.dumps(list(self.deleted_projects.items()))},\n'
+        yield '  "employees": {'
+        yield from self._encode_records(self.employees)
+        yield '},\n  "projects": {'
+        yield from self._encode_records(self.projects)
+        yield "}\n}"
+    
+    @staticmethod
+    def _encode_records(records: dict) -> Iterator[str]:
+        """Yield the members of a JSON object of records keyed by id."""
+        separator = "\n    "
+        for key, record in records.items():
+            yield f'{separator}"{key}": {record.encode()}'
+            separator = ",\n    "
+        if records:
+            yield "\n  "
+    
+    def load_data(self):
+        """Load data from JSON file, falling back to the newest valid backup."""
         try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
+            data, source = storage.read_document(self.data_file, self.backups)
+            if source != self.data_file:
+                print(f"Data file unreadable, recovered from backup {source}")
             
             self.next_employee_id = data.get('next_employee_id', 1)
             self.next_project_id = data.get('next_project_id', 1)
@@ -197,10 +609,24 @@ class DepartmentManager:
                 int(k): Employee.from_dict(v) 
                 for k, v in data.get('employees', {}).items()
             }
+            self.load_duplicates = [("employee", int(k)) for k in storage.duplicate_keys(data.get('employees'))]
             
             self.projects = {
                 int(k): Project.from_dict(v) 
                 for k, v in data.get('projects', {}).items()
             }
+            self.load_duplicates += [("project", int(k)) for k in storage.duplicate_keys(data.get('projects'))]
+            
+            self.deleted_employees = _tombstones(data.get('deleted_employees', []))
+            self.deleted_projects = _tombstones(data.get('deleted_projects', []))
+            if 'changefeed_seq' in data:
+                self.changes.reconcile(data['changefeed_seq'])
+        except FileNotFoundError:
+            return
         except Exception as e:
+            self.load_error = e
+            self.employees = {}
+            self.projects = {}
+            self.deleted_employees = {}
+            self.deleted_projects = {}
             print(f"Error loading data: {e}")
@@ -0,0 +1,239 @@
+"""Integrity - Referential integrity checks and repairs for department data.
+
+Every check runs in a single linear pass over employees and projects, using
+sets and dicts for membership tests, so it stays fast on large data files.
+
+Run from the command line to check (and optionally repair) a data file:
+
+    python integrity.py department_data.json --repair
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Optional
+
+from changefeed import changed_fields, snapshot
+
+if TYPE_CHECKING:
+    from department_manager import DepartmentManager
+
+
+@dataclass
+class IntegrityIssue:
+    """A single integrity problem found in the department data."""
+
+    code: str
+    entity: str  # employee, project, counter
+    entity_id: Optional[int]
+    message: str
+
+    def __str__(self) -> str:
+        """String representation of the issue."""
+        target = f"{self.entity} #{self.entity_id}" if self.entity_id is not None else self.entity
+        return f"[{self.code}] {target}: {self.message}"
+
+
+@dataclass
+class IntegrityReport:
+    """Result of an integrity check or repair."""
+
+    issues: list[IntegrityIssue] = field(default_factory=list)
+    repaired: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """True when no issues were found."""
+        return not self.issues
+
+    def add(self, code: str, entity: str, entity_id: Optional[int], message: str):
+        """Record a new issue."""
+        self.issues.append(IntegrityIssue(code, entity, entity_id, message))
+
+    def __str__(self) -> str:
+        """Summary of the report."""
+        if self.ok:
+            return "No integrity issues found."
+        verb = "Repaired" if self.repaired else "Found"
+        return f"{verb} {len(self.issues)} integrity issue(s)."
+
+
+def check_integrity(manager: 'DepartmentManager') -> IntegrityReport:
+    """Check the manager's data for referential integrity problems."""
+    report = IntegrityReport()
+    employees = manager.employees
+    projects = manager.projects
+
+    # Ids stored more than once in the data file; only the last copy was loaded
+    for entity, record_id in manager.load_duplicates:
+        report.add("duplicate_id", entity, record_id,
+                   "stored more than once in the data file; only the last copy was loaded")
+
+    # Project pass: team member references, duplicates and multiple teams
+    member_of: dict[int, int] = {}
+    max_project_id = 0
+    seen_project_ids: set[int] = set()
+    for key, project in projects.items():
+        if project.id != key:
+            report.add("id_mismatch", "project", key,
+                       f"stored under key {key} but has id {project.id}")
+        if project.id in seen_project_ids:
+            report.add("duplicate_id", "project", project.id, "id used by more than one project")
+        seen_project_ids.add(project.id)
+        max_project_id = max(max_project_id, key, project.id)
+
+        team: set[int] = set()
+        for emp_id in project.team_members:
+            if emp_id in team:
+                report.add("duplicate_member", "project", key,
+                           f"employee {emp_id} listed more than once")
+                continue
+            team.add(emp_id)
+
+            employee = employees.get(emp_id)
+            if employee is None:
+                report.add("dangling_member", "project", key,
+                           f"team member {emp_id} does not exist")
+                continue
+            if employee.current_project != key:
+                report.add("membership_mismatch", "project", key,
+                           f"team member {emp_id} is assigned to "
+                           f"{employee.current_project or 'no project'}")
+            if emp_id in member_of:
+                report.add("multiple_teams", "employee", emp_id,
+                           f"listed on projects {member_of[emp_id]} and {key}")
+            else:
+                member_of[emp_id] = key
+
+    # Employee pass: current project references
+    max_employee_id = 0
+    seen_employee_ids: set[int] = set()
+    for key, employee in employees.items():
+        if employee.id != key:
+            report.add("id_mismatch", "employee", key,
+                       f"stored under key {key} but has id {employee.id}")
+        if employee.id in seen_employee_ids:
+            report.add("duplicate_id", "employee", employee.id, "id used by more than one employee")
+        seen_employee_ids.add(employee.id)
+        max_employee_id = max(max_employee_id, key, employee.id)
+
+        project_id = employee.current_project
+        if project_id is None:
+            continue
+        if project_id not in projects:
+            report.add("dangling_project", "employee", key,
+                       f"current project {project_id} does not exist")
+        elif member_of.get(key) != project_id:
+            report.add("missing_from_team", "employee", key,
+                       f"not listed in the team of project {project_id}")
+
+    # Tombstones must refer to stored records
+    for entity, deleted, records in (("employee", manager.deleted_employees, employees),
+                                     ("project", manager.deleted_projects, projects)):
+        for record_id in deleted:
+            if record_id not in records:
+                report.add("dangling_tombstone", entity, record_id,
+                           "tombstoned but does not exist")
+
+    # Id counters
+    if manager.next_employee_id <= max_employee_id:
+        report.add("stale_counter", "counter", None,
+                   f"next_employee_id {manager.next_employee_id} <= max employee id {max_employee_id}")
+    if manager.next_project_id <= max_project_id:
+        report.add("stale_counter", "counter", None,
+                   f"next_project_id {manager.next_project_id} <= max project id {max_project_id}")
+
+    return report
+
+
+def repair_integrity(manager: 'DepartmentManager', save: bool = True) -> IntegrityReport:
+    """Repair integrity problems in place and return what was found.
+
+    An employee's ``current_project`` is treated as the source of truth:
+    dangling assignments are cleared and every project's ``team_members``
+    is rebuilt from it. Records whose id disagrees with their key take the key.
+    """
+    report = check_integrity(manager)
+    if report.ok:
+        return report
+
+    employees = manager.employees
+    projects = manager.projects
+    employees_before = {key: snapshot(employee) for key, employee in employees.items()}
+    projects_before = {key: snapshot(project) for key, project in projects.items()}
+
+    for key, project in projects.items():
+        project.id = key
+
+    teams: dict[int, list[int]] = {key: [] for key in projects}
+    for key, employee in employees.items():
+        employee.id = key
+        if employee.current_project is not None and employee.current_project not in projects:
+            employee.current_project = None
+
+    # Keep existing team order, then append members that were missing
+    placed: set[int] = set()
+    for key, project in projects.items():
+        for emp_id in project.team_members:
+            employee = employees.get(emp_id)
+            if employee and employee.current_project == key and emp_id not in placed:
+                teams[key].append(emp_id)
+                placed.add(emp_id)
+    for key, employee in employees.items():
+        if employee.current_project is not None and key not in placed:
+            teams[employee.current_project].append(key)
+    for key, project in projects.items():
+        project.team_members = teams[key]
+
+    # The repaired save keeps one copy; the dropped ones remain in the backups
+    manager.load_duplicates = []
+    manager.deleted_employees = {k: v for k, v in manager.deleted_employees.items() if k in employees}
+    manager.deleted_projects = {k: v for k, v in manager.deleted_projects.items() if k in projects}
+    manager.next_employee_id = max(manager.next_employee_id, max(employees, default=0) + 1)
+    manager.next_project_id = max(manager.next_project_id, max(projects, default=0) + 1)
+
+    for records, before in ((projects, projects_before), (employees, employees_before)):
+        for key, record in records.items():
+            if changed_fields(before[key], record.to_dict()):
+                record.mark_dirty()
+
+    report.repaired = True
+    for key, project in projects.items():
+        manager.changes.publish("project", key, "update", projects_before[key], snapshot(project))
+    for key, employee in employees.items():
+        manager.changes.publish("employee", key, "update", employees_before[key], snapshot(employee))
+    if save:
+        manager.save_data()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Check department data for integrity problems.")
+    parser.add_argument("data_file", nargs="?", default="department_data.json",
+                        help="path to the data file (default: department_data.json)")
+    parser.add_argument("--repair", action="store_true", help="repair problems and save the file")
+    parser.add_argument("--limit", type=int, default=50,
+                        help="maximum number of issues to print (default: 50, 0 for all)")
+    args = parser.parse_args(argv)
+
+    from department_manager import DepartmentManager
+
+    manager = DepartmentManager(args.data_file, compact_threshold=0)  # Never purge from the checker
+    if manager.load_error:
+        print(f"Could not load {args.data_file}: {manager.load_error}")
+        return 2
+
+    report = repair_integrity(manager) if args.repair else check_integrity(manager)
+    shown = report.issues if args.limit <= 0 else report.issues[:args.limit]
+    for issue in shown:
+        print(issue)
+    if len(shown) < len(report.issues):
+        print(f"... and {len(report.issues) - len(shown)} more")
+    print(report)
+
+    return 0 if report.ok or report.repaired else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
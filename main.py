@@ -1,20 +1,75 @@
 """Main application - Console-based Software Department Management System."""
 
 import os
-from department_manager import DepartmentManager
+import sys
+import threading
+from datetime import date, timedelta
+
+# ANSI: cursor home, clear screen, clear scrollback
+CLEAR_SCREEN = "\033[H\033[2J\033[3J"
+
+
+def enable_ansi() -> bool:
+    """Make sure the terminal understands ANSI escape codes."""
+    if os.name != 'nt':
+        return True
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (AttributeError, OSError):
+        return False
 
 
 class DepartmentApp:
     """Console application for managing a software department."""
     
     def __init__(self):
-        """Initialize the application."""
-        self.manager = DepartmentManager()
+        """Initialize the application.
+        
+        The data is loaded on a background thread so the first menu can be
+        shown right away; the first access to `manager` waits for it.
+        """
+        self._manager = None
+        self._load_error = None
+        self._loader = threading.Thread(target=self._load_manager, name="load-data", daemon=True)
+        self._loader.start()
+        self._ansi = None
         self.running = True
     
+    def _load_manager(self):
+        """Import and construct the DepartmentManager (runs on a background thread)."""
+        try:
+            from department_manager import DepartmentManager
+            self._manager = DepartmentManager()
+        except BaseException as e:
+            self._load_error = e
+    
+    @property
+    def manager(self):
+        """The DepartmentManager, waiting for the background load on first use."""
+        if self._manager is None:
+            self._loader.join()
+            if self._load_error:
+                raise self._load_error
+        return self._manager
+    
     def clear_screen(self):
         """Clear the console screen."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        if not sys.stdout.isatty():
+            return
+        if self._ansi is None:
+            self._ansi = enable_ansi()
+        if self._ansi:
+            sys.stdout.write(CLEAR_SCREEN)
+            sys.stdout.flush()
+        else:
+            os.system('cls' if os.name == 'nt' else 'clear')
     
     def print_header(self, title: str):
         """Print a formatted header."""
@@ -30,6 +85,14 @@ class DepartmentApp:
         print(f"  {len(options) + 1}. Back")
         print()
     
+    def describe_employee(self, employee) -> str:
+        """Employee details; a removed project shows as unassigned."""
+        return employee.describe(project_live=self.manager.get_project(employee.current_project) is not None)
+    
+    def describe_project(self, project) -> str:
+        """Project details, counting only team members that were not removed."""
+        return project.describe(team_size=len(self.manager.get_project_team(project.id)))
+    
     def get_input(self, prompt: str, required: bool = True) -> str:
         """Get user input with optional requirement."""
         while True:
@@ -89,7 +152,8 @@ class DepartmentApp:
                 "View All Employees",
                 "View Employee Details",
                 "Update Employee",
-                "Remove Employee"
+                "Remove Employee",
+                "Restore Employee"
             ]
             self.print_menu("Employee Management", options)
             
@@ -106,6 +170,8 @@ class DepartmentApp:
             elif choice == '5':
                 self.remove_employee()
             elif choice == '6':
+                self.restore_employee()
+            elif choice == '7':
                 break
             else:
                 print("Invalid option. Please try again.")
@@ -135,7 +201,7 @@ class DepartmentApp:
             print("No employees found.")
         else:
             for emp in employees:
-                print(f"\n{emp}")
+                print(f"\n{self.describe_employee(emp)}")
                 print("-" * 60)
         
         self.pause()
@@ -149,7 +215,7 @@ class DepartmentApp:
         try:
             employee = self.manager.get_employee(int(emp_id))
             if employee:
-                print(f"\n{employee}")
+                print(f"\n{self.describe_employee(employee)}")
             else:
                 print(f"Employee with ID {emp_id} not found.")
         except ValueError:
@@ -170,7 +236,7 @@ class DepartmentApp:
                 self.pause()
                 return
             
-            print(f"\nCurrent details:\n{employee}\n")
+            print(f"\nCurrent details:\n{self.describe_employee(employee)}\n")
             print("Leave blank to keep current value.\n")
             
             name = self.get_input("New name: ", required=False)
@@ -211,7 +277,7 @@ class DepartmentApp:
                 self.pause()
                 return
             
-            print(f"\n{employee}\n")
+            print(f"\n{self.describe_employee(employee)}\n")
             confirm = self.get_input("Are you sure you want to remove this employee? (yes/no): ")
             
             if confirm.lower() == 'yes':
@@ -224,6 +290,22 @@ class DepartmentApp:
         
         self.pause()
     
+    def restore_employee(self):
+        """Restore a removed employee."""
+        self.clear_screen()
+        self.print_header("Restore Employee")
+        
+        emp_id = self.get_input("Enter Employee ID: ")
+        try:
+            if self.manager.restore_employee(int(emp_id)):
+                print("\n✓ Employee restored successfully.")
+            else:
+                print(f"No removed employee with ID {emp_id} to restore.")
+        except ValueError:
+            print("Invalid ID format.")
+        
+        self.pause()
+    
     # Project Management
     def project_menu(self):
         """Project management menu."""
@@ -234,7 +316,8 @@ class DepartmentApp:
                 "View All Projects",
                 "View Project Details",
                 "Update Project",
-                "Remove Project"
+                "Remove Project",
+                "Restore Project"
             ]
             self.print_menu("Project Management", options)
             
@@ -251,6 +334,8 @@ class DepartmentApp:
             elif choice == '5':
                 self.remove_project()
             elif choice == '6':
+                self.restore_project()
+            elif choice == '7':
                 break
             else:
                 print("Invalid option. Please try again.")
@@ -282,7 +367,7 @@ class DepartmentApp:
             print("No projects found.")
         else:
             for proj in projects:
-                print(f"\n{proj}")
+                print(f"\n{self.describe_project(proj)}")
                 print("-" * 60)
         
         self.pause()
@@ -296,7 +381,7 @@ class DepartmentApp:
         try:
             project = self.manager.get_project(int(proj_id))
             if project:
-                print(f"\n{project}")
+                print(f"\n{self.describe_project(project)}")
                 
                 # Show team members
                 team = self.manager.get_project_team(int(proj_id))
@@ -324,13 +409,15 @@ class DepartmentApp:
                 self.pause()
                 return
             
-            print(f"\nCurrent details:\n{project}\n")
+            print(f"\nCurrent details:\n{self.describe_project(project)}\n")
             print("Leave blank to keep current value.\n")
             
             name = self.get_input("New name: ", required=False)
             description = self.get_input("New description: ", required=False)
             status = self.get_input("New status: ", required=False)
             tech_str = self.get_input("New technologies (comma-separated): ", required=False)
+            start_date = self.get_input("New start date (YYYY-MM-DD): ", required=False)
+            end_date = self.get_input("New end date (YYYY-MM-DD): ", required=False)
             
             updates = {}
             if name:
@@ -342,6 +429,15 @@ class DepartmentApp:
             if tech_str:
                 updates['technologies'] = [t.strip() for t in tech_str.split(',') if t.strip()]
             
+            from planning import parse_date
+            for key, value in (('start_date', start_date), ('end_date', end_date)):
+                if value and parse_date(value) is None:
+                    print(f"\nInvalid date {value!r}; use YYYY-MM-DD.")
+                    self.pause()
+                    return
+                if value:
+                    updates[key] = value
+            
             if updates:
                 self.manager.update_project(int(proj_id), **updates)
                 print("\n✓ Project updated successfully.")
@@ -365,7 +461,7 @@ class DepartmentApp:
                 self.pause()
                 return
             
-            print(f"\n{project}\n")
+            print(f"\n{self.describe_project(project)}\n")
             confirm = self.get_input("Are you sure you want to remove this project? (yes/no): ")
             
             if confirm.lower() == 'yes':
@@ -378,6 +474,22 @@ class DepartmentApp:
         
         self.pause()
     
+    def restore_project(self):
+        """Restore a removed project."""
+        self.clear_screen()
+        self.print_header("Restore Project")
+        
+        proj_id = self.get_input("Enter Project ID: ")
+        try:
+            if self.manager.restore_project(int(proj_id)):
+                print("\n✓ Project restored successfully.")
+            else:
+                print(f"No removed project with ID {proj_id} to restore.")
+        except ValueError:
+            print("Invalid ID format.")
+        
+        self.pause()
+    
     # Assignment Management
     def assignment_menu(self):
         """Assignment management menu."""
@@ -460,7 +572,7 @@ class DepartmentApp:
             if team:
                 print("Team Members:")
                 for emp in team:
-                    print(f"\n{emp}")
+                    print(f"\n{self.describe_employee(emp)}")
                     print("-" * 40)
             else:
                 print("No team members assigned to this project.")
@@ -470,6 +582,10 @@ class DepartmentApp:
         self.pause()
     
     # Reports
+    def analytics(self):
+        """Columnar snapshot of the current data for the reports."""
+        return self.manager.analytics()
+    
     def reports_menu(self):
         """Reports menu."""
         while True:
@@ -478,7 +594,11 @@ class DepartmentApp:
                 "Department Overview",
                 "Employees by Role",
                 "Projects by Status",
-                "Unassigned Employees"
+                "Unassigned Employees",
+                "Skills and Technology Breakdown",
+                "Run Query",
+                "Find Available Employees",
+                "Peak Headcount by Month"
             ]
             self.print_menu("Reports", options)
             
@@ -493,6 +613,14 @@ class DepartmentApp:
             elif choice == '4':
                 self.unassigned_employees()
             elif choice == '5':
+                self.skills_and_technology_breakdown()
+            elif choice == '6':
+                self.run_query()
+            elif choice == '7':
+                self.available_employees()
+            elif choice == '8':
+                self.peak_headcount()
+            elif choice == '9':
                 break
             else:
                 print("Invalid option. Please try again.")
@@ -503,17 +631,13 @@ class DepartmentApp:
         self.clear_screen()
         self.print_header("Department Overview")
         
-        employees = self.manager.list_employees()
-        projects = self.manager.list_projects()
+        overview = self.analytics().overview()
         
-        assigned = sum(1 for emp in employees if emp.current_project)
-        active_projects = sum(1 for proj in projects if proj.status == "Active")
-        
-        print(f"Total Employees: {len(employees)}")
-        print(f"Assigned Employees: {assigned}")
-        print(f"Unassigned Employees: {len(employees) - assigned}")
-        print(f"\nTotal Projects: {len(projects)}")
-        print(f"Active Projects: {active_projects}")
+        print(f"Total Employees: {overview['total_employees']}")
+        print(f"Assigned Employees: {overview['assigned_employees']}")
+        print(f"Unassigned Employees: {overview['unassigned_employees']}")
+        print(f"\nTotal Projects: {overview['total_projects']}")
+        print(f"Active Projects: {overview['active_projects']}")
         
         self.pause()
     
@@ -522,18 +646,15 @@ class DepartmentApp:
         self.clear_screen()
         self.print_header("Employees by Role")
         
-        employees = self.manager.list_employees()
-        roles = {}
-        
-        for emp in employees:
-            if emp.role not in roles:
-                roles[emp.role] = []
-            roles[emp.role].append(emp)
+        analytics = self.analytics()
+        roles = analytics.employees_by_role()
+        live_projects = analytics.team_sizes()
         
         for role, emps in sorted(roles.items()):
             print(f"\n{role} ({len(emps)}):")
             for emp in emps:
-                assigned = f"[Project #{emp.current_project}]" if emp.current_project else "[Unassigned]"
+                assigned = (f"[Project #{emp.current_project}]" if emp.current_project in live_projects
+                            else "[Unassigned]")
                 print(f"  - {emp.name} {assigned}")
         
         self.pause()
@@ -543,19 +664,14 @@ class DepartmentApp:
         self.clear_screen()
         self.print_header("Projects by Status")
         
-        projects = self.manager.list_projects()
-        statuses = {}
-        
-        for proj in projects:
-            if proj.status not in statuses:
-                statuses[proj.status] = []
-            statuses[proj.status].append(proj)
+        analytics = self.analytics()
+        statuses = analytics.projects_by_status()
+        team_sizes = analytics.team_sizes()
         
         for status, projs in sorted(statuses.items()):
             print(f"\n{status} ({len(projs)}):")
             for proj in projs:
-                team_size = len(proj.team_members)
-                print(f"  - {proj.name} [Team: {team_size}]")
+                print(f"  - {proj.name} [Team: {team_sizes[proj.id]}]")
         
         self.pause()
     
@@ -564,8 +680,7 @@ class DepartmentApp:
         self.clear_screen()
         self.print_header("Unassigned Employees")
         
-        employees = self.manager.list_employees()
-        unassigned = [emp for emp in employees if not emp.current_project]
+        unassigned = self.analytics().unassigned_employees()
         
         if not unassigned:
             print("All employees are assigned to projects.")
@@ -578,6 +693,106 @@ class DepartmentApp:
         
         self.pause()
     
+    def skills_and_technology_breakdown(self):
+        """Show skills by role, technologies by status, tenure and team sizes."""
+        self.clear_screen()
+        self.print_header("Skills and Technology Breakdown")
+        
+        analytics = self.analytics()
+        
+        print("Skills by Role:")
+        for (role, skill), count in sorted(analytics.skills_by_role().items()):
+            print(f"  {role:<20} {skill:<20} {count}")
+        
+        print("\nTechnologies by Project Status:")
+        for (status, tech), count in sorted(analytics.technologies_by_status().items()):
+            print(f"  {status:<20} {tech:<20} {count}")
+        
+        print("\nEmployee Tenure:")
+        for bucket, count in analytics.tenure_distribution().items():
+            print(f"  {bucket:<20} {count}")
+        
+        print("\nProject Team Sizes:")
+        for size, count in analytics.team_size_distribution().items():
+            print(f"  {size} member(s){'':<10} {count} project(s)")
+        
+        self.pause()
+    
+    def run_query(self):
+        """Find employees or projects with a query expression."""
+        self.clear_screen()
+        self.print_header("Run Query")
+        
+        print("Examples:")
+        print('  role = "Developer" and skills contains "Python" and project.status = "Active"')
+        print('  status = "Active" and technologies contains "React"   (projects)\n')
+        
+        target = self.get_input("Search employees or projects? (e/p, default: e): ", required=False)
+        entity = "project" if target.lower().startswith('p') else "employee"
+        expression = self.get_input("Query: ")
+        
+        from query import QueryError
+        try:
+            results = self.manager.query(expression, entity)
+        except QueryError as e:
+            print(f"\nInvalid query: {e}")
+            self.pause()
+            return
+        
+        print(f"\nFound {len(results)} {entity}(s):")
+        for record in results:
+            print(f"\n{record}")
+            print("-" * 60)
+        
+        self.pause()
+    
+    def available_employees(self):
+        """Find employees who are free between two dates."""
+        self.clear_screen()
+        self.print_header("Find Available Employees")
+        
+        start = self.get_input("From date (YYYY-MM-DD): ")
+        end = self.get_input("To date (YYYY-MM-DD): ")
+        skill = self.get_input("Skill (optional): ", required=False)
+        
+        try:
+            employees = self.manager.free_employees(start, end, skill or None)
+        except ValueError as e:
+            print(f"\n{e}")
+            self.pause()
+            return
+        
+        skill_note = f" with skill {skill}" if skill else ""
+        print(f"\n{len(employees)} employee(s) available from {start} to {end}{skill_note}:")
+        for emp in employees:
+            print(f"  - {emp.name} ({emp.role}) - {', '.join(emp.skills) or 'No skills listed'}")
+        
+        self.pause()
+    
+    def peak_headcount(self):
+        """Show the peak number of staffed employees per month."""
+        self.clear_screen()
+        self.print_header("Peak Headcount by Month")
+        
+        this_month = date.today().replace(day=1)
+        default_end = this_month.replace(year=this_month.year + 1) - timedelta(days=1)
+        start = self.get_input(f"From month (YYYY-MM, default: {this_month:%Y-%m}): ", required=False)
+        end = self.get_input(f"To month (YYYY-MM, default: {default_end:%Y-%m}): ", required=False)
+        
+        try:
+            peaks = self.manager.peak_headcount_by_month(start or this_month, end or default_end)
+        except ValueError as e:
+            print(f"\n{e}")
+            self.pause()
+            return
+        
+        print()
+        scale = 40 / max(max(peaks.values()), 40)
+        for month, headcount in peaks.items():
+            print(f"  {month}  {headcount:>5}  {'#' * round(headcount * scale)}")
+        
+        self.pause()
+    
     def run(self):
         """Run the application."""
         self.main_menu()
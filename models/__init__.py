@@ -0,0 +1,6 @@
+"""Data models for the software department."""
+
+from models.employee import Employee
+from models.project import Project
+
+__all__ = ["Employee", "Project"]
@@ -4,9 +4,11 @@ from dataclasses import dataclass, field
 from typing import Optional
 from datetime import datetime
 
+from models.record import Record
+
 
 @dataclass
-class Employee:
+class Employee(Record):
     """Represents an employee in the software department. SOmething nice"""
     
     id: int
@@ -19,12 +21,17 @@ class Employee:
     
     def __str__(self) -> str:
         """String representation of the employee."""
+        return self.describe()
+    
+    def describe(self, project_live: bool = True) -> str:
+        """String representation; without project_live the project shows as unassigned."""
         skills_str = ", ".join(self.skills) if self.skills else "None"
+        project = self.current_project if project_live else None
         return (f"ID: {self.id} | Name: {self.name} | Role: {self.role}\n"
                 f"  Email fancy: {self.email}\n"
                 f"  Skills: {skills_str}\n"
                 f"  Hire Date: {self.hire_date}\n"
-                f"  Current Project: {self.current_project or 'Unassigned'}")
+                f"  Current Project: {project or 'Unassigned'}")
     
     def to_dict(self) -> dict:
         """Convert employee to dictionary for JSON serialization."""
@@ -35,6 +42,7 @@ class Employee:
             'role': self.role,
             'email': self.email,
             'skills': self.skills,
+            'hire_date': self.hire_date,
             'current_project': self.current_project
         }
 
@@ -50,8 +58,3 @@ class Employee:
         print(f"Hire Date  : {self.hire_date}")
         print(f"Current Project: {self.current_project or 'Unassigned'}")
         print("===================================")
-    
-    @classmethod
-    def from_dict(cls, data: dict) -> 'Employee':
-        """Create employee from dictionary."""
-        return cls(**data)
@@ -4,9 +4,11 @@ from dataclasses import dataclass, field
 from typing import Optional
 from datetime import datetime
 
+from models.record import Record
+
 
 @dataclass
-class Project:
+class Project(Record):
     """Represents a software project."""
     
     id: int
@@ -20,8 +22,13 @@ class Project:
     
     def __str__(self) -> str:
         """String representation of the project."""
+        return self.describe()
+    
+    def describe(self, team_size: Optional[int] = None) -> str:
+        """String representation; team_size defaults to the length of the team list."""
         tech_str = ", ".join(self.technologies) if self.technologies else "None"
-        team_size = len(self.team_members)
+        if team_size is None:
+            team_size = len(self.team_members)
         return (f"ID: {self.id} | Name: {self.name}\n"
                 f"  Status: {self.status}\n"
                 f"  Description: {self.description}\n"
@@ -42,8 +49,3 @@ class Project:
             'team_members': self.team_members,
             'technologies': self.technologies
         }
-    
-    @classmethod
-    def from_dict(cls, data: dict) -> 'Project':
-        """Create project from dictionary."""
-        return cls(**data)
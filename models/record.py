@@ -0,0 +1,42 @@
+"""Shared persistence helpers for the department models."""
+
+import json
+from dataclasses import dataclass, field, fields
+from typing import Optional, Type, TypeVar
+
+R = TypeVar('R', bound='Record')
+
+
+@dataclass
+class Record:
+    """Base class for models saved as one JSON object per record.
+
+    The encoded JSON is cached, so saving unchanged records costs nothing.
+    Subclasses provide to_dict().
+    """
+
+    _encoded: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def to_dict(self) -> dict:
+        """Convert the record to a dictionary for JSON serialization."""
+        raise NotImplementedError
+
+    def mark_dirty(self) -> None:
+        """Drop the cached encoding so the record is re-encoded on next save.
+
+        Call this after changing a record in place (e.g. appending to a list)
+        outside of DepartmentManager.
+        """
+        self._encoded = None
+
+    def encode(self) -> str:
+        """Encode the record as JSON, reusing the cached text when unchanged."""
+        if self._encoded is None:
+            self._encoded = json.dumps(self.to_dict())
+        return self._encoded
+
+    @classmethod
+    def from_dict(cls: Type[R], data: dict) -> R:
+        """Create a record from a dictionary, ignoring unknown keys."""
+        names = {f.name for f in fields(cls) if f.init}
+        return cls(**{k: v for k, v in data.items() if k in names})
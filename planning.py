@@ -0,0 +1,302 @@
+"""Planning - Capacity planning over project timelines.
+
+Project ``start_date``/``end_date`` strings are parsed into dates and kept in
+an interval tree, so the projects running in a date range are found without
+scanning every project. Projects without an end date run indefinitely;
+projects whose dates cannot be parsed are kept aside as unscheduled. An
+employee is busy while their project runs, and a skill index finds the
+candidates for a skill directly.
+
+The planner subscribes to the manager's change feed and updates the tree and
+the skill index incrementally as projects, assignments and skills change.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Hashable, Iterator, List, Optional, Union
+
+if TYPE_CHECKING:
+    from changefeed import ChangeEvent
+    from department_manager import DepartmentManager
+    from models import Employee
+
+DateLike = Union[date, str]
+
+_DATE_FIELDS = {'start_date', 'end_date'}
+
+
+def parse_date(text: Optional[str], end: bool = False) -> Optional[date]:
+    """Parse a YYYY-MM-DD or YYYY-MM date; None if missing or malformed.
+
+    A bare month means its first day, or its last day when end is set.
+    """
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        pass
+    try:
+        month = date.fromisoformat(f"{text}-01")
+    except ValueError:
+        return None
+    return _next_month(month) - timedelta(days=1) if end else month
+
+
+def _to_date(value: DateLike, end: bool = False) -> date:
+    """Date from a date or a date string; raises ValueError if malformed."""
+    if isinstance(value, date):
+        return value
+    parsed = parse_date(value, end)
+    if parsed is None:
+        raise ValueError(f"Invalid date: {value!r} (expected YYYY-MM-DD or YYYY-MM)")
+    return parsed
+
+
+def _next_month(day: date) -> date:
+    """First day of the month after the month of day."""
+    return date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+
+
+def months(start: date, end: date) -> Iterator[date]:
+    """First days of the months from start's month to end's month."""
+    month = start.replace(day=1)
+    while month <= end:
+        yield month
+        month = _next_month(month)
+
+
+class _Node:
+    """Treap node holding one interval."""
+
+    __slots__ = ('start', 'end', 'key', 'priority', 'left', 'right', 'max_end')
+
+    def __init__(self, start: date, end: date, key: Hashable, priority: float):
+        """Create a leaf node."""
+        self.start = start
+        self.end = end
+        self.key = key
+        self.priority = priority
+        self.left: Optional['_Node'] = None
+        self.right: Optional['_Node'] = None
+        self.max_end = end
+
+    def update(self):
+        """Recompute the largest end date in this subtree."""
+        self.max_end = self.end
+        if self.left and self.left.max_end > self.max_end:
+            self.max_end = self.left.max_end
+        if self.right and self.right.max_end > self.max_end:
+            self.max_end = self.right.max_end
+
+
+class IntervalTree:
+    """Closed date intervals with keys, searchable by overlap.
+
+    A treap ordered by (start, key) where each node also records the largest
+    end date in its subtree. Inserts and removals take O(log n) expected
+    time, and overlap queries O(log n + k) for k results.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        """Create an empty tree."""
+        self._root: Optional[_Node] = None
+        self._random = random.Random(seed)
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of intervals."""
+        return self._size
+
+    def insert(self, start: date, end: date, key: Hashable):
+        """Add the interval [start, end]; (start, key) must be unique."""
+        node = _Node(start, end, key, self._random.random())
+        left, right = self._split(self._root, (start, key))
+        self._root = self._merge(self._merge(left, node), right)
+        self._size += 1
+
+    def remove(self, start: date, key: Hashable) -> bool:
+        """Remove the interval with the given start and key."""
+        self._root, removed = self._remove(self._root, (start, key))
+        if removed:
+            self._size -= 1
+        return removed
+
+    def overlap(self, start: date, end: date) -> Iterator[Hashable]:
+        """Keys of the intervals that share at least one day with [start, end]."""
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end < start:
+                continue  # Everything below ends too early
+            stack.append(node.left)
+            if node.start <= end:
+                if node.end >= start:
+                    yield node.key
+                stack.append(node.right)
+
+    def _split(self, node: Optional[_Node], at: tuple) -> tuple[Optional[_Node], Optional[_Node]]:
+        """Split into the nodes ordered before at and the rest."""
+        if node is None:
+            return None, None
+        if (node.start, node.key) < at:
+            node.right, right = self._split(node.right, at)
+            node.update()
+            return node, right
+        left, node.left = self._split(node.left, at)
+        node.update()
+        return left, node
+
+    def _merge(self, left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+        """Join two treaps where every node of left is ordered before right."""
+        if left is None or right is None:
+            return left or right
+        if left.priority > right.priority:
+            left.right = self._merge(left.right, right)
+            left.update()
+            return left
+        right.left = self._merge(left, right.left)
+        right.update()
+        return right
+
+    def _remove(self, node: Optional[_Node], at: tuple) -> tuple[Optional[_Node], bool]:
+        """Remove the node ordered at `at` from a subtree."""
+        if node is None:
+            return None, False
+        order = (node.start, node.key)
+        if order == at:
+            return self._merge(node.left, node.right), True
+        if at < order:
+            node.left, removed = self._remove(node.left, at)
+        else:
+            node.right, removed = self._remove(node.right, at)
+        if removed:
+            node.update()
+        return node, removed
+
+
+class CapacityPlanner:
+    """Project timelines and employee skills of a DepartmentManager."""
+
+    def __init__(self, manager: 'DepartmentManager'):
+        """Index the manager's data and follow its changes."""
+        self.manager = manager
+        self.timeline = IntervalTree()
+        self.unscheduled: set[int] = set()  # Projects with missing or malformed dates
+        self._spans: dict[int, tuple[date, date]] = {}
+        self._skills: dict[str, set[int]] = {}
+        with manager.lock:
+            for employee in manager.list_employees():
+                self._add_skills(employee.id, employee.skills)
+            for project in manager.list_projects():
+                self._schedule(project.id, project.start_date, project.end_date)
+            manager.subscribe(self._apply, synchronous=True)
+
+    # Incremental maintenance
+    def _apply(self, event: 'ChangeEvent'):
+        """Update the indexes for one change event."""
+        if event.entity == 'employee':
+            if event.op == 'update' and 'skills' not in event.changed_fields:
+                return
+            if event.before:
+                self._remove_skills(event.entity_id, event.before['skills'])
+            if event.after:
+                self._add_skills(event.entity_id, event.after['skills'])
+        else:
+            # Team changes need no work: teams are read when a query runs
+            if event.op == 'update' and not _DATE_FIELDS.intersection(event.changed_fields):
+                return
+            self._unschedule(event.entity_id)
+            if event.after:
+                self._schedule(event.entity_id, event.after['start_date'], event.after['end_date'])
+
+    def _add_skills(self, employee_id: int, skills: List[str]):
+        """Index an employee under each of their skills."""
+        for skill in skills:
+            self._skills.setdefault(skill.casefold(), set()).add(employee_id)
+
+    def _remove_skills(self, employee_id: int, skills: List[str]):
+        """Drop an employee from the index of each of their skills."""
+        for skill in skills:
+            holders = self._skills.get(skill.casefold())
+            if holders is not None:
+                holders.discard(employee_id)
+                if not holders:
+                    del self._skills[skill.casefold()]
+
+    def _schedule(self, project_id: int, start_date: Optional[str], end_date: Optional[str]):
+        """Add a project to the timeline, or to the unscheduled projects."""
+        start = parse_date(start_date)
+        end = parse_date(end_date, end=True) if end_date else date.max
+        if start is None or end is None or end < start:
+            self.unscheduled.add(project_id)
+            return
+        self._spans[project_id] = (start, end)
+        self.timeline.insert(start, end, project_id)
+
+    def _unschedule(self, project_id: int):
+        """Remove a project from the timeline."""
+        self.unscheduled.discard(project_id)
+        span = self._spans.pop(project_id, None)
+        if span:
+            self.timeline.remove(span[0], project_id)
+
+    # Queries
+    def free_employees(self, start: DateLike, end: DateLike,
+                       skill: Optional[str] = None) -> List['Employee']:
+        """Employees not staffed between start and end (inclusive).
+
+        Employees on a project whose timeline overlaps the range are busy, as
+        are members of unscheduled projects. With skill, only employees having
+        that skill (case-insensitive) are returned.
+        """
+        start, end = _to_date(start), _to_date(end, end=True)
+        if end < start:
+            raise ValueError("End date is before start date")
+
+        manager = self.manager
+        with manager.lock:
+            if skill:
+                candidates = set(self._skills.get(skill.casefold(), ()))
+            else:
+                candidates = manager.employees.keys() - manager.deleted_employees
+            for project_id in [*self.timeline.overlap(start, end), *self.unscheduled]:
+                candidates.difference_update(manager.projects[project_id].team_members)
+            return [manager.employees[employee_id] for employee_id in sorted(candidates)]
+
+    def peak_headcount_by_month(self, start: DateLike, end: DateLike) -> dict[str, int]:
+        """Highest number of people staffed at the same time, per month.
+
+        Keys are YYYY-MM for every month from start's month to end's month.
+        Unscheduled projects are not counted.
+        """
+        first = _to_date(start).replace(day=1)
+        last = _next_month(_to_date(end, end=True)) - timedelta(days=1)
+        if last < first:
+            raise ValueError("End date is before start date")
+
+        peaks = {month.strftime("%Y-%m"): 0 for month in months(first, last)}
+        with self.manager.lock:
+            # Staffing changes: +n on a project's first day, -n after its last
+            changes = []
+            for project_id in self.timeline.overlap(first, last):
+                staff = len(self.manager.get_project_team(project_id))
+                if staff:
+                    project_start, project_end = self._spans[project_id]
+                    changes.append((max(project_start, first), staff))
+                    if project_end < last:
+                        changes.append((project_end + timedelta(days=1), -staff))
+        changes.sort()  # Departures before arrivals on the same day
+
+        # The headcount is constant between consecutive changes
+        level = 0
+        for index, (day, delta) in enumerate(changes):
+            level += delta
+            until = changes[index + 1][0] if index + 1 < len(changes) else last + timedelta(days=1)
+            if level <= 0 or until == day:
+                continue
+            for month in months(day, until - timedelta(days=1)):
+                key = month.strftime("%Y-%m")
+                peaks[key] = max(peaks[key], level)
+        return peaks
@@ -0,0 +1,407 @@
+"""Query - A small filter language over employees and projects.
+
+Queries are boolean expressions over record fields, for example::
+
+    role = "Developer" and skills contains "Python" and project.status = "Active"
+
+Operators are ``=``, ``!=``, ``<``, ``<=``, ``>``, ``>=`` and ``contains``
+(substring for text, membership for lists), combined with ``and``, ``or``,
+``not`` and parentheses. Values are quoted strings, numbers or ``null``.
+When querying employees, ``project.<field>`` refers to the employee's current
+project.
+
+The planner splits a top-level ``and`` into conjuncts, evaluates project
+conjuncts first to get the set of matching projects, and then drives the
+employee scan from whichever hash index (or project join) yields the fewest
+candidates. Compiled queries and the results of the most recent queries are
+cached (least recently used first out); results and indexes are dropped
+whenever the manager publishes a change.
+"""
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from models import Employee, Project
+
+if TYPE_CHECKING:
+    from changefeed import ChangeEvent
+    from department_manager import DepartmentManager
+
+ENTITY_FIELDS = {
+    'employee': {f.name for f in fields(Employee) if f.init},
+    'project': {f.name for f in fields(Project) if f.init},
+}
+LIST_FIELDS = {('employee', 'skills'), ('project', 'team_members'), ('project', 'technologies')}
+
+# Fields with a hash index: (entity, field) -> indexed by membership for lists
+INDEXED_FIELDS = {
+    ('employee', 'role'), ('employee', 'skills'), ('employee', 'current_project'),
+    ('project', 'status'), ('project', 'technologies'), ('project', 'name'),
+}
+
+RESULT_CACHE_SIZE = 256  # Distinct queries whose results are kept
+
+
+class QueryError(ValueError):
+    """Raised for malformed queries."""
+
+
+# Syntax tree
+@dataclass(frozen=True)
+class Compare:
+    """field <op> value on one entity."""
+
+    entity: str
+    field: str
+    op: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class And:
+    """All items must match."""
+
+    items: tuple
+
+
+@dataclass(frozen=True)
+class Or:
+    """Any item must match."""
+
+    items: tuple
+
+
+@dataclass(frozen=True)
+class Not:
+    """The item must not match."""
+
+    item: Any
+
+
+Node = Union[Compare, And, Or, Not]
+
+
+# Parsing
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<op>!=|<=|>=|=|<|>)
+      | (?P<paren>[()])
+      | (?P<word>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)?)
+    )""", re.VERBOSE)
+
+
+def tokenize(text: str) -> list[tuple[str, Any]]:
+    """Split a query into (kind, value) tokens."""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise QueryError(f"Unexpected character at position {position}: {text[position]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        elif kind == 'number':
+            value = float(value) if '.' in value else int(value)
+        elif kind == 'word' and value.lower() in ('and', 'or', 'not', 'contains', 'null'):
+            kind, value = value.lower(), value.lower()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing a syntax tree."""
+
+    def __init__(self, text: str, entity: str):
+        """Tokenize text; unqualified fields refer to entity."""
+        self.tokens = tokenize(text)
+        self.position = 0
+        self.entity = entity
+
+    def peek(self) -> Optional[str]:
+        """Kind of the next token, or None at the end."""
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def take(self, kind: str):
+        """Consume a token of the given kind and return its value."""
+        if self.peek() != kind:
+            found = self.tokens[self.position][1] if self.peek() else "end of query"
+            raise QueryError(f"Expected {kind} but found {found!r}")
+        value = self.tokens[self.position][1]
+        self.position += 1
+        return value
+
+    def parse(self) -> Node:
+        """Parse the whole query."""
+        if not self.tokens:
+            raise QueryError("Empty query")
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QueryError(f"Unexpected {self.tokens[self.position][1]!r}")
+        return node
+
+    def parse_or(self) -> Node:
+        """or_expr := and_expr ('or' and_expr)*"""
+        items = [self.parse_and()]
+        while self.peek() == 'or':
+            self.take('or')
+            items.append(self.parse_and())
+        return items[0] if len(items) == 1 else Or(tuple(items))
+
+    def parse_and(self) -> Node:
+        """and_expr := not_expr ('and' not_expr)*"""
+        items = [self.parse_not()]
+        while self.peek() == 'and':
+            self.take('and')
+            items.append(self.parse_not())
+        return items[0] if len(items) == 1 else And(tuple(items))
+
+    def parse_not(self) -> Node:
+        """not_expr := 'not' not_expr | '(' or_expr ')' | comparison"""
+        if self.peek() == 'not':
+            self.take('not')
+            return Not(self.parse_not())
+        if self.peek() == 'paren' and self.tokens[self.position][1] == '(':
+            self.take('paren')
+            node = self.parse_or()
+            if self.take('paren') != ')':
+                raise QueryError("Expected ')'")
+            return node
+        return self.parse_compare()
+
+    def parse_compare(self) -> Compare:
+        """comparison := field op value"""
+        entity, name = self.resolve(self.take('word'))
+        op = self.take('contains') if self.peek() == 'contains' else self.take('op')
+
+        kind = self.peek()
+        if kind == 'null':
+            self.take('null')
+            value = None
+        elif kind in ('string', 'number'):
+            value = self.take(kind)
+        else:
+            raise QueryError(f"Expected a value after {name} {op}")
+
+        if (entity, name) in LIST_FIELDS and op != 'contains':
+            raise QueryError(f"Use 'contains' to match items of {name}")
+        return Compare(entity, name, op, value)
+
+    def resolve(self, word: str) -> tuple[str, str]:
+        """Split a field reference into (entity, field) and validate it."""
+        entity, _, name = word.rpartition('.')
+        entity = entity or self.entity
+        if entity not in ENTITY_FIELDS:
+            raise QueryError(f"Unknown entity {entity!r}")
+        if self.entity == 'project' and entity == 'employee':
+            raise QueryError("Project queries cannot filter on employee fields")
+        if name not in ENTITY_FIELDS[entity]:
+            raise QueryError(f"Unknown {entity} field {name!r}")
+        return entity, name
+
+
+@lru_cache(maxsize=256)
+def compile_query(text: str, entity: str = 'employee') -> Node:
+    """Parse a query into a syntax tree (cached)."""
+    if entity not in ENTITY_FIELDS:
+        raise QueryError(f"Cannot query {entity!r}")
+    return _Parser(text, entity).parse()
+
+
+# Evaluation
+def evaluate(node: Node, row: dict[str, Any]) -> bool:
+    """Evaluate a syntax tree against {'employee': ..., 'project': ...}."""
+    if isinstance(node, And):
+        return all(evaluate(item, row) for item in node.items)
+    if isinstance(node, Or):
+        return any(evaluate(item, row) for item in node.items)
+    if isinstance(node, Not):
+        return not evaluate(node.item, row)
+
+    record = row.get(node.entity)
+    if record is None:
+        return False
+    actual = getattr(record, node.field)
+    try:
+        if node.op == '=':
+            return actual == node.value
+        if node.op == '!=':
+            return actual != node.value
+        if node.op == 'contains':
+            return actual is not None and node.value in actual
+        if actual is None or node.value is None:
+            return False
+        if node.op == '<':
+            return actual < node.value
+        if node.op == '<=':
+            return actual <= node.value
+        if node.op == '>':
+            return actual > node.value
+        return actual >= node.value
+    except TypeError:
+        return False
+
+
+def _entities(node: Node) -> set[str]:
+    """Entities a syntax tree refers to."""
+    if isinstance(node, Compare):
+        return {node.entity}
+    if isinstance(node, Not):
+        return _entities(node.item)
+    return set().union(*(_entities(item) for item in node.items))
+
+
+def _indexable(node: Node) -> bool:
+    """Whether a conjunct can be answered from a hash index."""
+    return (isinstance(node, Compare) and (node.entity, node.field) in INDEXED_FIELDS
+            and node.op == ('contains' if (node.entity, node.field) in LIST_FIELDS else '='))
+
+
+class QueryEngine:
+    """Plans and runs queries against a DepartmentManager."""
+
+    def __init__(self, manager: 'DepartmentManager'):
+        """Attach to a manager and invalidate caches on its changes."""
+        self.manager = manager
+        self._indexes: dict[tuple[str, str], dict[Any, set[int]]] = {}
+        self._results: OrderedDict[tuple[str, str], list[int]] = OrderedDict()
+        manager.subscribe(self._invalidate, synchronous=True)
+
+    def _invalidate(self, event: 'ChangeEvent'):
+        """Drop cached results and the indexes of the changed entity."""
+        self._results.clear()
+        for key in [key for key in self._indexes if key[0] == event.entity]:
+            del self._indexes[key]
+
+    def _records(self, entity: str) -> dict:
+        """Records of an entity keyed by id."""
+        return self.manager.employees if entity == 'employee' else self.manager.projects
+
+    def _deleted(self, entity: str) -> dict[int, str]:
+        """Ids of the tombstoned records of an entity, which queries skip."""
+        return self.manager.deleted_employees if entity == 'employee' else self.manager.deleted_projects
+
+    def index(self, entity: str, name: str) -> dict[Any, set[int]]:
+        """Hash index from field value to record ids, built on first use."""
+        key = (entity, name)
+        if key not in self._indexes:
+            index: dict[Any, set[int]] = {}
+            is_list = key in LIST_FIELDS
+            deleted = self._deleted(entity)
+            for record_id, record in self._records(entity).items():
+                if record_id in deleted:
+                    continue
+                value = getattr(record, name)
+                for item in (value if is_list else [value]):
+                    index.setdefault(item, set()).add(record_id)
+            self._indexes[key] = index
+        return self._indexes[key]
+
+    def _select(self, entity: str, conjuncts: list[Node], plan: list[str]) -> list[int]:
+        """Ids of the records matching all conjuncts of one entity."""
+        records = self._records(entity)
+        candidates: Optional[set[int]] = None
+        driver = None
+        for node in conjuncts:
+            if _indexable(node):
+                posting = self.index(entity, node.field).get(node.value, set())
+                if candidates is None or len(posting) < len(candidates):
+                    candidates, driver = posting, node
+        if driver is None:
+            plan.append(f"scan {entity} ({len(records)} rows)")
+            candidates = records.keys() - self._deleted(entity)
+        else:
+            plan.append(f"index {entity}.{driver.field} = {driver.value!r} ({len(candidates)} rows)")
+
+        rest = [node for node in conjuncts if node is not driver]
+        return [record_id for record_id in sorted(candidates)
+                if all(evaluate(node, {entity: records[record_id]}) for node in rest)]
+
+    def plan(self, text: str, entity: str = 'employee') -> tuple[list[int], list[str]]:
+        """Run a query and return matching ids with a description of the plan."""
+        tree = compile_query(text, entity)
+        conjuncts = list(tree.items) if isinstance(tree, And) else [tree]
+        plan: list[str] = []
+
+        if entity == 'project':
+            return self._select('project', conjuncts, plan), plan
+
+        employee_only = [c for c in conjuncts if _entities(c) == {'employee'}]
+        project_only = [c for c in conjuncts if _entities(c) == {'project'}]
+        mixed = [c for c in conjuncts if len(_entities(c)) > 1]
+        employees = self.manager.employees
+
+        # Push project filters down before the join
+        project_ids: Optional[set[int]] = None
+        unassigned_ok = True
+        if project_only:
+            project_ids = set(self._select('project', project_only, plan))
+            unassigned_ok = all(evaluate(c, {'employee': None, 'project': None}) for c in project_only)
+
+        # Drive the employee scan from the smallest candidate source
+        candidates: Optional[set[int]] = None
+        driver = None
+        for node in employee_only:
+            if _indexable(node):
+                posting = self.index('employee', node.field).get(node.value, set())
+                if candidates is None or len(posting) < len(candidates):
+                    candidates, driver = posting, node
+        if project_ids is not None and not unassigned_ok:
+            by_project = self.index('employee', 'current_project')
+            joined = set().union(*(by_project.get(pid, set()) for pid in project_ids))
+            if candidates is None or len(joined) < len(candidates):
+                candidates, driver = joined, 'join'
+                plan.append(f"join employees on project ({len(joined)} rows)")
+        if driver is None:
+            plan.append(f"scan employee ({len(employees)} rows)")
+            candidates = employees.keys() - self.manager.deleted_employees
+        elif driver != 'join':
+            plan.append(f"index employee.{driver.field} = {driver.value!r} ({len(candidates)} rows)")
+
+        rest = [node for node in employee_only if node is not driver] + mixed
+        if project_only:
+            plan.append("filter employees by matching projects")
+        if rest:
+            plan.append(f"filter {len(rest)} remaining condition(s)")
+
+        result = []
+        for employee_id in sorted(candidates):
+            employee = employees[employee_id]
+            project = self.manager.get_project(employee.current_project)
+            if project_ids is not None:
+                if project is None and not unassigned_ok:
+                    continue
+                if project is not None and project.id not in project_ids:
+                    continue
+            row = {'employee': employee, 'project': project}
+            if all(evaluate(node, row) for node in rest):
+                result.append(employee_id)
+        return result, plan
+
+    def run(self, text: str, entity: str = 'employee') -> list:
+        """Records matching a query, using cached results when unchanged."""
+        key = (entity, text)
+        with self.manager.lock:
+            ids = self._results.get(key)
+            if ids is None:
+                ids, _ = self.plan(text, entity)
+                self._results[key] = ids
+                if len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+            else:
+                self._results.move_to_end(key)
+            records = self._records(entity)
+            return [records[record_id] for record_id in ids]
+
+    def explain(self, text: str, entity: str = 'employee') -> list[str]:
+        """Describe how a query would be run."""
+        with self.manager.lock:
+            return self.plan(text, entity)[1]
@@ -0,0 +1,379 @@
+"""Sharding - Manage several departments stored in separate data files.
+
+ShardedDepartmentManager partitions employees and projects across one data
+file per shard inside a directory. Each shard is an ordinary
+DepartmentManager; a shared id allocator keeps employee and project ids
+unique across all shards, so lookups by id are routed to the right shard
+without knowing the department. Shards are loaded in parallel, and
+company-wide reports run on every shard in parallel and are then merged.
+
+Records do not store their department, so a department's records are the
+contents of its shard only with by_department partitioning. With by_hash a
+shard mixes several departments, and moving employees between departments
+is not supported.
+"""
+
+import re
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, List
+
+from analytics import TENURE_BUCKETS
+from changefeed import ChangeEvent
+from department_manager import DepartmentManager
+from models import Employee, Project
+
+Partition = Callable[[str], str]
+
+# Reports whose keys have a meaningful order, restored after merging shards
+_REPORT_ORDER: dict[str, Callable[[Any], Any]] = {
+    'tenure_distribution': TENURE_BUCKETS.index,
+    'team_size_distribution': lambda size: size,
+}
+
+
+def by_department(department: str) -> str:
+    """One shard per department, named after the department."""
+    key = re.sub(r"[^a-z0-9]+", "-", department.strip().lower()).strip("-")
+    if not key:
+        raise ValueError(f"Invalid department name: {department!r}")
+    return key
+
+
+def by_hash(num_shards: int) -> Partition:
+    """Spread departments over a fixed number of shards by hashing the name.
+
+    A shard holds several departments without recording which record belongs
+    to which, so shards cannot be split back into departments.
+    """
+    if num_shards < 1:
+        raise ValueError("num_shards must be at least 1")
+
+    def partition(department: str) -> str:
+        bucket = zlib.crc32(department.strip().lower().encode("utf-8")) % num_shards
+        return f"shard-{bucket:02d}"
+    return partition
+
+
+class GlobalIdAllocator:
+    """Hands out employee and project ids that are unique across shards."""
+
+    def __init__(self):
+        """Initialize the allocator with no ids in use."""
+        self.next_employee_id = 1
+        self.next_project_id = 1
+        self._lock = threading.Lock()
+
+    def observe(self, manager: DepartmentManager):
+        """Make sure future ids are above every id used by a shard."""
+        with self._lock:
+            self.next_employee_id = max(self.next_employee_id, manager.next_employee_id)
+            self.next_project_id = max(self.next_project_id, manager.next_project_id)
+
+    def allocate_employee_id(self) -> int:
+        """Reserve the next employee id."""
+        with self._lock:
+            employee_id = self.next_employee_id
+            self.next_employee_id += 1
+            return employee_id
+
+    def allocate_project_id(self) -> int:
+        """Reserve the next project id."""
+        with self._lock:
+            project_id = self.next_project_id
+            self.next_project_id += 1
+            return project_id
+
+
+class ShardedDepartmentManager:
+    """Manages employees and projects of many departments across shard files."""
+
+    def __init__(self, data_dir: str = "departments", partition: Partition = by_department,
+                 max_workers: Optional[int] = None, **manager_options):
+        """Load every shard file in data_dir in parallel.
+
+        manager_options are passed on to each shard's DepartmentManager.
+        Each shard numbers its own change events, so a changefeed path is
+        split per shard: changes.jsonl becomes changes.<shard key>.jsonl.
+        """
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.partition = partition
+        self.max_workers = max_workers
+        self.manager_options = manager_options
+        self.shards: dict[str, DepartmentManager] = {}
+        self.ids = GlobalIdAllocator()
+        self._employee_shard: dict[int, str] = {}
+        self._project_shard: dict[int, str] = {}
+        self._subscribers: list[Callable[[ChangeEvent], None]] = []
+        self.load_shards()
+
+    # Shards
+    def shard_file(self, key: str) -> Path:
+        """Data file of a shard."""
+        return self.data_dir / f"{key}.json"
+
+    def changefeed_file(self, key: str) -> Path:
+        """Changefeed log of a shard, next to the changefeed path given."""
+        feed = Path(self.manager_options['changefeed'])
+        return feed.with_name(f"{feed.stem}.{key}{feed.suffix}")
+
+    def load_shards(self):
+        """Load all shard files in parallel and rebuild the id routing tables.
+
+        Shard files that were separate department data files number their
+        ids independently. Ids already taken by an earlier shard (in key
+        order) are renumbered with fresh global ids, references included, and
+        the renumbered shard is saved so the new ids stick.
+        """
+        keys = sorted(path.stem for path in self.data_dir.glob("*.json"))
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            managers = list(pool.map(self._open_shard, keys))
+        for manager in managers:
+            self.ids.observe(manager)  # Fresh ids must not collide with any shard
+        for key, manager in zip(keys, managers):
+            employee_ids = {employee_id: self.ids.allocate_employee_id()
+                            for employee_id in manager.employees if employee_id in self._employee_shard}
+            project_ids = {project_id: self.ids.allocate_project_id()
+                           for project_id in manager.projects if project_id in self._project_shard}
+            if employee_ids or project_ids:
+                _renumber(manager, employee_ids, project_ids)
+                print(f"Shard {key}: renumbered {len(employee_ids)} employee and {len(project_ids)} "
+                      f"project ids already used by another shard")
+            self._register(key, manager)
+
+    def _open_shard(self, key: str) -> DepartmentManager:
+        """Create the DepartmentManager for a shard."""
+        options = dict(self.manager_options)
+        if options.get('changefeed'):
+            options['changefeed'] = str(self.changefeed_file(key))
+        return DepartmentManager(str(self.shard_file(key)), **options)
+
+    def _register(self, key: str, manager: DepartmentManager):
+        """Add a loaded shard to the routing tables."""
+        self.shards[key] = manager
+        self.ids.observe(manager)
+        for employee_id in manager.employees:
+            self._employee_shard[employee_id] = key
+        for project_id in manager.projects:
+            self._project_shard[project_id] = key
+        for callback in self._subscribers:
+            manager.subscribe(callback)
+
+    def shard_for(self, department: str) -> DepartmentManager:
+        """Shard holding a department, created on first use."""
+        key = self.partition(department)
+        if key not in self.shards:
+            self._register(key, self._open_shard(key))
+        return self.shards[key]
+
+    def _employee_home(self, employee_id: int) -> Optional[DepartmentManager]:
+        """Shard holding an employee."""
+        key = self._employee_shard.get(employee_id)
+        return self.shards[key] if key else None
+
+    def _project_home(self, project_id: int) -> Optional[DepartmentManager]:
+        """Shard holding a project."""
+        key = self._project_shard.get(project_id)
+        return self.shards[key] if key else None
+
+    def scatter(self, func: Callable[[DepartmentManager], Any]) -> dict[str, Any]:
+        """Run func on every shard in parallel; returns results by shard key."""
+        keys = list(self.shards)
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            results = pool.map(lambda key: func(self.shards[key]), keys)
+            return dict(zip(keys, results))
+
+    # Employee Management
+    def add_employee(self, department: str, name: str, role: str, email: str,
+                     skills: List[str]) -> Employee:
+        """Add a new employee to a department."""
+        shard = self.shard_for(department)
+        employee = shard.add_employee(name, role, email, skills,
+                                      employee_id=self.ids.allocate_employee_id())
+        self._employee_shard[employee.id] = self.partition(department)
+        return employee
+
+    def get_employee(self, employee_id: int) -> Optional[Employee]:
+        """Get an employee by ID from whichever shard holds it."""
+        shard = self._employee_home(employee_id)
+        return shard.get_employee(employee_id) if shard else None
+
+    def list_employees(self) -> List[Employee]:
+        """List all employees in all shards."""
+        return [e for employees in self.scatter(DepartmentManager.list_employees).values() for e in employees]
+
+    def update_employee(self, employee_id: int, **kwargs) -> bool:
+        """Update employee information."""
+        shard = self._employee_home(employee_id)
+        return shard.update_employee(employee_id, **kwargs) if shard else False
+
+    def remove_employee(self, employee_id: int, permanent: bool = False) -> bool:
+        """Remove an employee; tombstoned employees stay routable for a restore."""
+        shard = self._employee_home(employee_id)
+        if not shard or not shard.remove_employee(employee_id, permanent):
+            return False
+        if permanent:
+            del self._employee_shard[employee_id]
+        return True
+
+    def restore_employee(self, employee_id: int) -> bool:
+        """Undo the removal of an employee."""
+        shard = self._employee_home(employee_id)
+        return shard.restore_employee(employee_id) if shard else False
+
+    def move_employee(self, employee_id: int, department: str) -> bool:
+        """Move an employee to another department, keeping their ID.
+
+        The employee is unassigned from their project if it stays behind.
+        Only supported with by_department partitioning; raises ValueError
+        otherwise, since departments sharing a hashed shard are not recorded.
+        """
+        if self.partition is not by_department:
+            raise ValueError("Moving employees needs one shard per department (partition=by_department)")
+        source = self._employee_home(employee_id)
+        if not source:
+            return False
+        target = self.shard_for(department)
+        if target is source:
+            return True
+
+        employee = source.get_employee(employee_id)
+        if not employee:
+            return False
+        # Copy first so a failure never leaves the employee in neither shard
+        target.add_employee(employee.name, employee.role, employee.email, employee.skills,
+                            employee_id=employee_id)
+        try:
+            target.update_employee(employee_id, hire_date=employee.hire_date)
+        except BaseException:
+            target.remove_employee(employee_id, permanent=True)
+            raise
+        source.remove_employee(employee_id, permanent=True)
+        self._employee_shard[employee_id] = self.partition(department)
+        return True
+
+    # Project Management
+    def add_project(self, department: str, name: str, description: str, technologies: List[str],
+                    status: str = "Planning") -> Project:
+        """Add a new project to a department."""
+        shard = self.shard_for(department)
+        project = shard.add_project(name, description, technologies, status,
+                                    project_id=self.ids.allocate_project_id())
+        self._project_shard[project.id] = self.partition(department)
+        return project
+
+    def get_project(self, project_id: int) -> Optional[Project]:
+        """Get a project by ID from whichever shard holds it."""
+        shard = self._project_home(project_id)
+        return shard.get_project(project_id) if shard else None
+
+    def list_projects(self) -> List[Project]:
+        """List all projects in all shards."""
+        return [p for projects in self.scatter(DepartmentManager.list_projects).values() for p in projects]
+
+    def update_project(self, project_id: int, **kwargs) -> bool:
+        """Update project information."""
+        shard = self._project_home(project_id)
+        return shard.update_project(project_id, **kwargs) if shard else False
+
+    def remove_project(self, project_id: int, permanent: bool = False) -> bool:
+        """Remove a project; tombstoned projects stay routable for a restore."""
+        shard = self._project_home(project_id)
+        if not shard or not shard.remove_project(project_id, permanent):
+            return False
+        if permanent:
+            del self._project_shard[project_id]
+        return True
+
+    def restore_project(self, project_id: int) -> bool:
+        """Undo the removal of a project."""
+        shard = self._project_home(project_id)
+        return shard.restore_project(project_id) if shard else False
+
+    # Assignment Management
+    def assign_to_project(self, employee_id: int, project_id: int) -> bool:
+        """Assign an employee to a project of the same shard."""
+        shard = self._employee_home(employee_id)
+        if not shard or shard is not self._project_home(project_id):
+            return False
+        return shard.assign_to_project(employee_id, project_id)
+
+    def unassign_from_project(self, employee_id: int) -> bool:
+        """Unassign an employee from their current project."""
+        shard = self._employee_home(employee_id)
+        return shard.unassign_from_project(employee_id) if shard else False
+
+    def get_project_team(self, project_id: int) -> List[Employee]:
+        """Get all employees assigned to a project."""
+        shard = self._project_home(project_id)
+        return shard.get_project_team(project_id) if shard else []
+
+    def compact(self) -> tuple[int, int]:
+        """Purge tombstoned records on every shard in parallel."""
+        purged = self.scatter(DepartmentManager.compact).values()
+        for routes, records in ((self._employee_shard, 'employees'), (self._project_shard, 'projects')):
+            for record_id in [i for i, key in routes.items() if i not in getattr(self.shards[key], records)]:
+                del routes[record_id]
+        return sum(e for e, _ in purged), sum(p for _, p in purged)
+
+    # Change Data Capture
+    def subscribe(self, callback: Callable[[ChangeEvent], None]):
+        """Call callback with the change events of every shard."""
+        self._subscribers.append(callback)
+        for shard in self.shards.values():
+            shard.subscribe(callback)
+
+    # Reports
+    def report(self, name: str):
+        """Run a DepartmentAnalytics report on every shard and merge the results.
+
+        Counts are added up and lists of records are concatenated.
+        """
+        results = self.scatter(lambda shard: getattr(shard.analytics(), name)())
+        merged = _merge(results.values())
+        if name in _REPORT_ORDER and merged:
+            key = _REPORT_ORDER[name]
+            merged = dict(sorted(merged.items(), key=lambda item: key(item[0])))
+        return merged
+
+
+def _renumber(manager: DepartmentManager, employee_ids: dict[int, int], project_ids: dict[int, int]):
+    """Give records of a shard new ids, update references and save the shard."""
+    with manager.lock:
+        manager.employees = {employee_ids.get(key, key): employee for key, employee in manager.employees.items()}
+        manager.projects = {project_ids.get(key, key): project for key, project in manager.projects.items()}
+        for key, employee in manager.employees.items():
+            employee.id = key
+            employee.current_project = project_ids.get(employee.current_project, employee.current_project)
+            employee.mark_dirty()
+        for key, project in manager.projects.items():
+            project.id = key
+            project.team_members = [employee_ids.get(member, member) for member in project.team_members]
+            project.mark_dirty()
+        manager.deleted_employees = {employee_ids.get(key, key): removed
+                                     for key, removed in manager.deleted_employees.items()}
+        manager.deleted_projects = {project_ids.get(key, key): removed
+                                    for key, removed in manager.deleted_projects.items()}
+        manager.next_employee_id = max(manager.next_employee_id, max(manager.employees, default=0) + 1)
+        manager.next_project_id = max(manager.next_project_id, max(manager.projects, default=0) + 1)
+        manager.save_data()
+
+
+def _merge(results: Iterable[Any]) -> Any:
+    """Merge per-shard report results of the same shape."""
+    merged: Any = None
+    for result in results:
+        if merged is None:
+            merged = result
+        elif isinstance(result, list):
+            merged = merged + result
+        elif isinstance(result, dict):
+            merged = dict(merged)
+            for key, value in result.items():
+                merged[key] = _merge([merged[key], value]) if key in merged else value
+        else:
+            merged = merged + result
+    return merged
@@ -0,0 +1,423 @@
+"""Storage - Crash-safe persistence for department data files.
+
+Documents are written to a temporary file in the same directory, fsynced and
+then moved over the data file with ``os.replace``, so a crash mid-write never
+leaves a half-written data file behind. The previous versions are kept as
+numbered backups (``department_data.json.1`` is the newest).
+
+The document is wrapped in an envelope that carries a checksum of the exact
+bytes of the payload:
+
+    {"data": {...},
+     "checksum": "sha256:<hex digest>"}
+
+Files written before checksums were introduced are still read as plain JSON.
+
+Data files ending in ``.gz``, ``.bz2``, ``.xz`` or ``.lzma`` are compressed
+with the matching standard library codec. Documents are streamed through the
+compressor while writing, and compressed files are decoded incrementally while
+reading (one top-level member or record at a time), so the decompressed
+document is never held in memory as a whole.
+"""
+
+import bz2
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import os
+import re
+import stat
+from json.decoder import scanstring
+from pathlib import Path
+from typing import IO, Any, Callable, Iterable, Iterator, Optional
+
+_PREFIX = '{"data": '
+_TRAILER = ',\n "checksum": "sha256:{digest}"}}\n'
+_TRAILER_PATTERN = re.compile(rb',\n "checksum": "sha256:([0-9a-f]{64})"\}\s*\Z')
+_BLOCK_SIZE = 64 * 1024
+
+# Compressed stream factories by file extension: (binary file, mode) -> stream
+CODECS: dict[str, Callable[[IO[bytes], str], IO[bytes]]] = {
+    '.gz': lambda f, mode: gzip.GzipFile(filename='', fileobj=f, mode=mode, compresslevel=6),
+    '.bz2': lambda f, mode: bz2.BZ2File(f, mode),
+    '.xz': lambda f, mode: lzma.LZMAFile(f, mode),
+    '.lzma': lambda f, mode: lzma.LZMAFile(f, mode, format=lzma.FORMAT_ALONE),
+}
+
+
+class ChecksumError(ValueError):
+    """Raised when a data file's checksum is missing or does not match."""
+
+
+class Records(dict):
+    """Decoded JSON object that remembers keys occurring more than once.
+
+    JSON decoding keeps the last value of a repeated key; the other keys are
+    listed in ``duplicates`` so callers can report them.
+    """
+
+    def __init__(self, pairs=()):
+        """Build the object from (key, value) pairs in document order."""
+        super().__init__()
+        self.duplicates: list[str] = []
+        for key, value in pairs:
+            if key in self:
+                self.duplicates.append(key)
+            self[key] = value
+
+
+def duplicate_keys(obj) -> list[str]:
+    """Keys that occurred more than once in a decoded JSON object."""
+    return getattr(obj, 'duplicates', [])
+
+
+def _object_pairs(pairs: list) -> dict:
+    """json object_pairs_hook: a plain dict unless a key is repeated."""
+    obj = dict(pairs)
+    return obj if len(obj) == len(pairs) else Records(pairs)
+
+
+def _loads(data: bytes) -> dict:
+    """Decode a document, noting repeated record keys.
+
+    Data files put every record of the employee and project objects on a line
+    indented by exactly four spaces, so counting those lines is a cheap check
+    for repeated keys; only when the count disagrees is the document decoded
+    again with a hook that records them.
+    """
+    obj = json.loads(data)
+    records = sum(len(value) for value in obj.values() if isinstance(value, dict))
+    if data.count(b'\n    "') != records:
+        obj = json.loads(data, object_pairs_hook=_object_pairs)
+    return obj
+
+
+def backup_path(path: Path, index: int) -> Path:
+    """Path of the numbered backup for a data file."""
+    return path.with_name(f"{path.name}.{index}")
+
+
+def codec_for(path: Path) -> Optional[Callable[[IO[bytes], str], IO[bytes]]]:
+    """Compression codec for a data file, chosen by extension (None for plain)."""
+    return CODECS.get(Path(path).suffix.lower())
+
+
+def write_document(path: Path, chunks: Iterable[str], backups: int = 3):
+    """Durably write the JSON text given as chunks to path.
+
+    The current file is rotated into the backups before being replaced.
+    """
+    path = Path(path)
+    codec = codec_for(path)
+    fd, tmp_name = _create_temp(path)
+    try:
+        # Keep the permissions of the file being replaced so shared readers keep working
+        mode = _file_mode(path)
+        if mode is not None:
+            os.chmod(tmp_name, mode)
+        with os.fdopen(fd, 'wb') as raw:
+            stream = codec(raw, 'wb') if codec else raw
+            digest = hashlib.sha256()
+            stream.write(_PREFIX.encode('utf-8'))
+            for block in _batched(chunks):
+                data = block.encode('utf-8')
+                digest.update(data)
+                stream.write(data)
+            stream.write(_TRAILER.format(digest=digest.hexdigest()).encode('utf-8'))
+            if stream is not raw:
+                stream.close()  # Flushes the compressed trailer; leaves raw open
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        rotate_backups(path, backups)
+        os.replace(tmp_name, path)
+        _fsync_directory(path.parent)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+
+def _create_temp(path: Path) -> tuple[int, str]:
+    """Create a new temporary file next to path; returns its descriptor and name.
+
+    The file is created with mode 0o666 and the kernel applies the umask, so it
+    gets the same permissions as a file created with a plain open.
+    """
+    while True:
+        name = str(path.with_name(f".{path.name}.{os.urandom(6).hex()}.tmp"))
+        try:
+            return os.open(name, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0),
+                           0o666), name
+        except FileExistsError:
+            continue
+
+
+def _file_mode(path: Path) -> Optional[int]:
+    """Permission bits of an existing file; None if it does not exist."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return None
+
+
+def _batched(chunks: Iterable[str], size: int = _BLOCK_SIZE) -> Iterator[str]:
+    """Join small chunks into blocks of roughly size characters."""
+    pending: list[str] = []
+    length = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(pending)
+            pending, length = [], 0
+    if pending:
+        yield "".join(pending)
+
+
+def rotate_backups(path: Path, backups: int):
+    """Shift numbered backups up by one and move the current file to backup 1."""
+    if backups <= 0 or not path.exists():
+        return
+
+    for index in range(backups - 1, 0, -1):
+        source = backup_path(path, index)
+        if source.exists():
+            os.replace(source, backup_path(path, index + 1))
+    os.replace(path, backup_path(path, 1))
+
+
+def read_document(path: Path, backups: int = 3) -> tuple[dict, Path]:
+    """Read and verify a data file, falling back to the newest valid backup.
+
+    Returns the decoded data and the path it was read from. Raises
+    FileNotFoundError when neither the file nor any backup exists.
+    """
+    path = Path(path)
+    codec = codec_for(path)
+    candidates = [path] + [backup_path(path, i) for i in range(1, backups + 1)]
+    errors = []
+
+    for candidate in candidates:
+        if not candidate.exists():
+            continue
+        try:
+            return _read_verified(candidate, codec), candidate
+        except (OSError, EOFError, ValueError, lzma.LZMAError) as e:
+            errors.append(f"{candidate}: {e}")
+
+    if not errors:
+        raise FileNotFoundError(path)
+    raise ChecksumError("no valid copy of the data file; " + "; ".join(errors))
+
+
+def _read_verified(path: Path, codec) -> dict:
+    """Read one file and verify its checksum if it has one.
+
+    Plain files are read whole and decoded by ``json.loads``, which is about
+    twice as fast as the incremental reader; compressed files are streamed.
+    """
+    if codec is None:
+        return _read_plain(path)
+
+    with open(path, 'rb') as raw:
+        stream = codec(raw, 'rb') if codec else raw
+        text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        reader = _JsonReader(text.read)
+
+        if not reader.consume(_PREFIX):
+            # Legacy file written without a checksum envelope
+            data = reader.read_object()
+            reader.expect_end()
+            return data
+
+        reader.start_hash()
+        data = reader.read_object()
+        digest = reader.stop_hash()
+
+        if not reader.consume(',') or reader.read_value() != "checksum" or not reader.consume(':'):
+            raise ChecksumError("checksum missing, file is truncated")
+        checksum = reader.read_value()
+        if not reader.consume('}'):
+            raise ChecksumError("checksum missing, file is truncated")
+        reader.expect_end()
+
+        if checksum != f"sha256:{digest}":
+            raise ChecksumError("checksum mismatch")
+        return data
+
+
+def _read_plain(path: Path) -> dict:
+    """Read and verify an uncompressed data file in one go."""
+    data = path.read_bytes()
+    prefix = _PREFIX.encode('utf-8')
+    if not data.startswith(prefix):
+        # Legacy file written without a checksum envelope
+        return _loads(data)
+
+    match = _TRAILER_PATTERN.search(data, len(prefix))
+    if not match:
+        raise ChecksumError("checksum missing, file is truncated")
+    body = data[len(prefix):match.start()]
+    if hashlib.sha256(body).hexdigest() != match.group(1).decode('ascii'):
+        raise ChecksumError("checksum mismatch")
+    return _loads(body)
+
+
+class _JsonReader:
+    """Incremental reader for the two-level JSON objects used by data files.
+
+    Top-level members and the members of nested objects are decoded one at a
+    time, so only a single record needs to be buffered. Text that has been
+    consumed can be fed into a running checksum.
+    """
+
+    _WHITESPACE = re.compile(r"[ \t\n\r]*")
+    _MEMBER = re.compile(r'[ \t\n\r]*("(?:[^"\\]|\\.)*")[ \t\n\r]*:[ \t\n\r]*')
+    _SEPARATOR = re.compile(r"[ \t\n\r]*([,}])")
+
+    def __init__(self, read: Callable[[int], str]):
+        """Read text in blocks using read(size)."""
+        self._read = read
+        self._decoder = json.JSONDecoder(object_pairs_hook=_object_pairs)
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self._digest = None
+        self._hashed = 0  # Start of the consumed text not hashed yet
+
+    def _fill(self) -> bool:
+        """Read another block, dropping consumed text; False at end of file."""
+        if self.eof:
+            return False
+        block = self._read(_BLOCK_SIZE)
+        if not block:
+            self.eof = True
+            return False
+        if self._digest is not None:
+            self._digest.update(self.buffer[self._hashed:self.position].encode('utf-8'))
+        self.buffer = self.buffer[self.position:] + block
+        self.position = 0
+        self._hashed = 0
+        return True
+
+    def start_hash(self):
+        """Start hashing the text consumed from here on."""
+        self._digest = hashlib.sha256()
+        self._hashed = self.position
+
+    def stop_hash(self) -> str:
+        """Stop hashing and return the hex digest of the consumed text."""
+        self._digest.update(self.buffer[self._hashed:self.position].encode('utf-8'))
+        digest, self._digest = self._digest.hexdigest(), None
+        return digest
+
+    def _skip_whitespace(self):
+        """Advance past whitespace, reading more text when needed."""
+        while True:
+            self.position = self._WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or not self._fill():
+                return
+
+    def _peek(self) -> str:
+        """Next non-whitespace character, or '' at end of file."""
+        self._skip_whitespace()
+        return self.buffer[self.position] if self.position < len(self.buffer) else ""
+
+    def consume(self, text: str) -> bool:
+        """Consume text (after whitespace) if it comes next."""
+        self._skip_whitespace()
+        while len(self.buffer) - self.position < len(text) and self._fill():
+            pass
+        if self.buffer.startswith(text, self.position):
+            self.position += len(text)
+            return True
+        return False
+
+    def _expect(self, text: str):
+        """Consume text or fail."""
+        if not self.consume(text):
+            raise ValueError(f"Expected {text!r} at offset {self.position} of the buffered text")
+
+    def expect_end(self):
+        """Fail unless only whitespace is left."""
+        if self._peek():
+            raise ValueError("Unexpected data after the JSON document")
+
+    def read_value(self) -> Any:
+        """Decode one complete JSON value."""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if end == len(self.buffer) and self._fill():
+                continue  # A number may continue in the next block
+            self.position = end
+            return value
+
+    def read_object(self) -> dict:
+        """Decode the top-level object; nested objects are read record by record."""
+        self._expect('{')
+        result = Records()
+        if self.consume('}'):
+            return result
+        while True:
+            key = self.read_value()
+            if key in result:
+                result.duplicates.append(key)
+            self._expect(':')
+            if self._peek() == '{':
+                result[key] = self._read_records()
+            else:
+                result[key] = self.read_value()
+            if self.consume('}'):
+                return result
+            self._expect(',')
+
+    def _read_records(self) -> dict:
+        """Decode an object whose members are records, one member at a time."""
+        self._expect('{')
+        records = Records()
+        if self.consume('}'):
+            return records
+        while True:
+            # Match key, value and separator in one go; read more text if the
+            # member is not completely buffered yet
+            member = self._MEMBER.match(self.buffer, self.position)
+            if member:
+                try:
+                    value, end = self._decoder.raw_decode(self.buffer, member.end())
+                    separator = self._SEPARATOR.match(self.buffer, end)
+                except json.JSONDecodeError:
+                    separator = None
+                if separator:
+                    key = scanstring(member.group(1), 1)[0]
+                    if key in records:
+                        records.duplicates.append(key)
+                    records[key] = value
+                    self.position = separator.end()
+                    if separator.group(1) == '}':
+                        return records
+                    continue
+            if not self._fill():
+                raise ValueError("Unexpected end of the JSON document")
+
+
+def _fsync_directory(directory: Path):
+    """Flush a directory entry change to disk where the platform allows it."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened on Windows
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,6 @@
+"""Make the modules in the repository root importable when running plain pytest."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,55 @@
+"""Tests for the reports built on the analytics snapshot."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from department_manager import DepartmentManager
+
+
+class ReportTests(unittest.TestCase):
+    """Reports count the live records the same way the manager does."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        manager = DepartmentManager(str(Path(self._tmp.name) / "department_data.json"))
+        self.apollo = manager.add_project("Apollo", "Moon landing", ["Python"], status="Active")
+        self.gemini = manager.add_project("Gemini", "Orbit", ["Go"])
+        for name in ("Ada", "Grace", "Linus"):
+            manager.add_employee(name, "Developer", f"{name.lower()}@example.com", [])
+        manager.assign_to_project(1, self.apollo.id)
+        manager.assign_to_project(2, self.apollo.id)
+        manager.assign_to_project(3, self.gemini.id)
+        self.manager = manager
+
+    def test_reports_skip_removed_records(self):
+        self.manager.remove_employee(2)
+        self.manager.remove_project(self.gemini.id)
+        analytics = self.manager.analytics()
+
+        self.assertEqual(analytics.overview(), {
+            'total_employees': 2, 'assigned_employees': 1, 'unassigned_employees': 1,
+            'total_projects': 1, 'active_projects': 1,
+        })
+        self.assertEqual([e.name for e in analytics.unassigned_employees()], ["Linus"])
+        self.assertEqual(analytics.team_sizes(), {self.apollo.id: 1})
+
+    def test_team_sizes_match_project_teams(self):
+        self.apollo.team_members.append(1)  # Duplicate entry, as found by the integrity check
+        self.manager.remove_employee(3)
+        sizes = self.manager.analytics().team_sizes()
+
+        for project in self.manager.list_projects():
+            self.assertEqual(sizes[project.id], len(self.manager.get_project_team(project.id)))
+
+    def test_snapshot_is_rebuilt_after_a_change(self):
+        analytics = self.manager.analytics()
+        self.assertIs(self.manager.analytics(), analytics)
+
+        self.manager.unassign_from_project(1)
+        self.assertEqual(self.manager.analytics().overview()['unassigned_employees'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Tests for the changefeed log staying consistent with the data file."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from changefeed import ChangeFeedGap, ChangeLog
+from department_manager import DepartmentManager
+
+
+class ChangeFeedLogTests(unittest.TestCase):
+    """Readers either get every event after their cursor or a ChangeFeedGap."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.data_file = Path(self._tmp.name) / "department_data.json"
+        self.log_file = Path(self._tmp.name) / "changes.jsonl"
+
+    def open(self, **options) -> DepartmentManager:
+        return DepartmentManager(str(self.data_file), changefeed=str(self.log_file), **options)
+
+    def seqs(self, manager: DepartmentManager, cursor: int = 0) -> list:
+        return [event.seq for event in manager.changes.read_since(cursor)]
+
+    def test_events_resume_after_reopen(self):
+        manager = self.open()
+        manager.add_employee("Ada", "Developer", "ada@example.com", [])
+        manager.add_employee("Grace", "QA", "grace@example.com", [])
+
+        manager = self.open()
+        manager.update_employee(1, role="Lead")
+        self.assertEqual(self.seqs(manager), [1, 2, 3])
+        self.assertEqual(self.seqs(manager, 2), [3])
+
+    def test_failed_append_is_reported_as_gap(self):
+        manager = self.open()
+        manager.add_employee("Ada", "Developer", "ada@example.com", [])
+        with mock.patch.object(ChangeLog, "append", side_effect=OSError("disk full")):
+            manager.add_employee("Grace", "QA", "grace@example.com", [])
+        manager.update_employee(1, role="Lead")
+
+        self.assertEqual([e.name for e in self.open().list_employees()], ["Ada", "Grace"])
+        events = manager.changes.read_since(0)
+        self.assertEqual(next(events).seq, 1)
+        with self.assertRaises(ChangeFeedGap) as caught:
+            next(events)
+        self.assertEqual((caught.exception.expected, caught.exception.found), (2, 3))
+        self.assertEqual(self.seqs(manager, 2), [3])
+
+    def test_events_of_unsaved_change_are_discarded(self):
+        manager = self.open()
+        manager.add_employee("Ada", "Developer", "ada@example.com", [])
+        with mock.patch("storage.write_document", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                manager.add_employee("Grace", "QA", "grace@example.com", [])
+        self.assertEqual(self.seqs(manager), [1, 2])
+
+        manager = self.open()
+        self.assertEqual(self.seqs(manager), [1])
+        manager.add_employee("Linus", "Developer", "linus@example.com", [])
+        self.assertEqual(self.seqs(manager), [1, 2])
+
+    def test_lost_events_are_reported_as_gap(self):
+        manager = self.open()
+        manager.add_employee("Ada", "Developer", "ada@example.com", [])
+        manager.add_employee("Grace", "QA", "grace@example.com", [])
+        lines = self.log_file.read_text(encoding="utf-8").splitlines(keepends=True)
+        self.log_file.write_text(lines[0], encoding="utf-8")  # Event 2 never reached the log
+
+        manager = self.open()
+        manager.update_employee(1, role="Lead")
+        with self.assertRaises(ChangeFeedGap):
+            self.seqs(manager)
+
+    def test_cursor_older_than_log_is_reported(self):
+        manager = DepartmentManager(str(self.data_file), changefeed=None)
+        manager.changes.log = ChangeLog(str(self.log_file), max_bytes=1, backups=1)
+        for name in ("Ada", "Grace", "Linus"):
+            manager.add_employee(name, "Developer", f"{name.lower()}@example.com", [])
+
+        self.assertEqual(self.seqs(manager, 1), [2, 3])
+        with self.assertRaises(ChangeFeedGap):
+            self.seqs(manager, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
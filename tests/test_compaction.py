@@ -0,0 +1,109 @@
+"""Tests for tombstone retention and compaction."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import integrity
+import storage
+from department_manager import DepartmentManager
+
+
+class TombstoneTestCase(unittest.TestCase):
+    """A project with three assigned employees."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.data_file = Path(self._tmp.name) / "department_data.json"
+        manager = DepartmentManager(str(self.data_file), compact_threshold=2)
+        self.project = manager.add_project("Apollo", "Moon landing", ["Python"])
+        for name in ("Ada", "Grace", "Linus"):
+            employee = manager.add_employee(name, "Developer", f"{name.lower()}@example.com", [])
+            manager.assign_to_project(employee.id, self.project.id)
+        self.manager = manager
+
+    def reopen(self, **options) -> DepartmentManager:
+        return DepartmentManager(str(self.data_file), compact_threshold=2, **options)
+
+
+class CompactionTests(TombstoneTestCase):
+    """Tombstones stay restorable until they expire or compact() is called."""
+
+    def test_mass_removal_can_be_restored(self):
+        self.assertEqual(self.manager.remove_employees([1, 2, 3]), 3)
+        self.manager.wait_for_compaction()
+
+        manager = self.reopen()
+        manager.wait_for_compaction()
+        self.assertTrue(manager.restore_employee(2))
+        self.assertEqual([e.name for e in manager.get_project_team(self.project.id)], ["Grace"])
+
+    def test_expired_tombstones_are_purged_in_background(self):
+        self.manager.remove_employees([1, 2])
+        manager = self.reopen(tombstone_days=-1)  # Everything removed so far has expired
+        manager.wait_for_compaction()
+        self.assertEqual(set(manager.employees), {1, 2, 3})
+
+        manager.remove_employee(3)
+        manager.wait_for_compaction()
+        self.assertEqual(manager.employees, {})
+        self.assertEqual(manager.projects[self.project.id].team_members, [])
+        self.assertTrue(manager.verify_integrity().ok)
+
+    def test_compact_purges_only_old_tombstones(self):
+        self.manager.remove_employees([1, 2])
+        self.manager.deleted_employees[1] = "2000-01-01T00:00:00"
+
+        self.assertEqual(self.manager.compact(older_than_days=30), (1, 0))
+        self.assertEqual(list(self.manager.deleted_employees), [2])
+        self.assertEqual(self.manager.compact(), (1, 0))
+
+    def test_bare_id_tombstones_still_load(self):
+        data, _ = storage.read_document(self.data_file, 0)
+        data["deleted_employees"] = [1, 2]
+        self.data_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+        manager = self.reopen(tombstone_days=0)
+        self.assertEqual(list(manager.deleted_employees), [1, 2])
+        manager.remove_employee(3)
+        manager.wait_for_compaction()
+        self.assertTrue(manager.restore_employee(1))
+
+    def test_checker_does_not_purge(self):
+        self.manager.remove_employees([1, 2])
+        self.manager.deleted_employees[1] = "2000-01-01T00:00:00"
+        self.manager.save_data()
+        saved = self.data_file.read_bytes()
+
+        self.assertEqual(integrity.main([str(self.data_file)]), 0)
+        self.assertEqual(self.data_file.read_bytes(), saved)
+
+
+class RemovedRecordDisplayTests(TombstoneTestCase):
+    """The CLI hides tombstoned records in the details it prints."""
+
+    def app(self):
+        import main
+        app = main.DepartmentApp.__new__(main.DepartmentApp)
+        app._manager = self.manager
+        return app
+
+    def test_team_size_counts_live_members(self):
+        self.manager.remove_employee(1)
+        text = self.app().describe_project(self.manager.get_project(self.project.id))
+        self.assertIn("Team Size: 2", text)
+
+    def test_removed_project_shows_as_unassigned(self):
+        self.manager.remove_project(self.project.id)
+        text = self.app().describe_employee(self.manager.get_employee(1))
+        self.assertIn("Current Project: Unassigned", text)
+
+        self.manager.restore_project(self.project.id)
+        text = self.app().describe_employee(self.manager.get_employee(1))
+        self.assertIn(f"Current Project: {self.project.id}", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
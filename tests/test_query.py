@@ -0,0 +1,125 @@
+"""Tests for the query language and its planner."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import query
+from department_manager import DepartmentManager
+from query import QueryError, compile_query, evaluate
+
+QUERIES = [
+    'role = "Developer"',
+    'skills contains "Python" and role != "QA"',
+    'project.status = "Active"',
+    'not project.status = "Active"',
+    'project.status != "Active"',
+    'project.status = "Active" or project.status = "Planning"',
+    'role = "Developer" and not project.technologies contains "Go"',
+    'current_project = null',
+    'role = "QA" and (project.name = "Apollo" or skills contains "SQL")',
+    'id >= 3 and id < 6',
+]
+
+
+class QueryTestCase(unittest.TestCase):
+    """A small department with unassigned and removed records."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        manager = DepartmentManager(str(Path(self._tmp.name) / "department_data.json"))
+        apollo = manager.add_project("Apollo", "Moon landing", ["Python"], status="Active")
+        gemini = manager.add_project("Gemini", "Orbit", ["Go"], status="Planning")
+        mercury = manager.add_project("Mercury", "First flight", ["SQL"], status="Active")
+        people = [("Ada", "Developer", ["Python"], apollo), ("Grace", "QA", ["SQL"], apollo),
+                  ("Linus", "Developer", ["Go"], gemini), ("Barbara", "Developer", ["Python"], None),
+                  ("Ken", "QA", [], mercury), ("Margaret", "Developer", ["Python", "SQL"], mercury),
+                  ("Dennis", "QA", ["Python"], None)]
+        for name, role, skills, project in people:
+            employee = manager.add_employee(name, role, f"{name.lower()}@example.com", skills)
+            if project:
+                manager.assign_to_project(employee.id, project.id)
+        manager.remove_employee(6)  # Tombstoned employee
+        manager.remove_project(mercury.id)  # Ken is unassigned while Mercury is removed
+        self.manager = manager
+
+    def brute_force(self, text: str) -> list:
+        tree = compile_query(text)
+        return [e.name for e in self.manager.list_employees()
+                if evaluate(tree, {'employee': e, 'project': self.manager.get_project(e.current_project)})]
+
+    def names(self, text: str) -> list:
+        return [e.name for e in self.manager.query(text)]
+
+
+class QueryTests(QueryTestCase):
+    """Planned queries return what evaluating every row would return."""
+
+    def test_matches_brute_force(self):
+        for text in QUERIES:
+            with self.subTest(text):
+                self.assertEqual(self.names(text), self.brute_force(text))
+
+    def test_unassigned_employees_match_negated_project_conditions(self):
+        # Comparisons against a missing project are false, so only a negation
+        # lets unassigned employees (and those of removed projects) through
+        self.assertEqual(self.names('project.status != "Active"'), ["Linus"])
+        self.assertEqual(self.names('not project.status = "Active"'), ["Linus", "Barbara", "Ken", "Dennis"])
+
+    def test_project_queries(self):
+        self.assertEqual([p.name for p in self.manager.query('status = "Active"', "project")], ["Apollo"])
+        with self.assertRaises(QueryError):
+            self.manager.query('role = "QA"', "project")
+
+    def test_malformed_queries(self):
+        for text in ('role =', 'role = "QA" and', 'salary > 3', '(role = "QA"', 'role ~ "QA"'):
+            with self.subTest(text), self.assertRaises(QueryError):
+                self.manager.query(text)
+
+
+class PlannerTests(QueryTestCase):
+    """The planner drives the scan from the smallest candidate source."""
+
+    def test_index_on_selective_field(self):
+        plan = self.manager.explain_query('role = "Developer" and skills contains "Go"')
+        self.assertEqual(plan[0], "index employee.skills = 'Go' (1 rows)")
+
+    def test_join_on_selective_project_filter(self):
+        plan = self.manager.explain_query('project.name = "Gemini" and role = "Developer"')
+        self.assertEqual(plan[0], "index project.name = 'Gemini' (1 rows)")
+        self.assertEqual(plan[1], "join employees on project (1 rows)")
+        self.assertEqual(self.names('project.name = "Gemini" and role = "Developer"'), ["Linus"])
+
+    def test_no_join_when_unassigned_employees_can_match(self):
+        plan = self.manager.explain_query('not project.status = "Active"')
+        self.assertNotIn("join", " ".join(plan))
+        self.assertIn("scan employee", " ".join(plan))
+
+    def test_scan_without_index(self):
+        plan = self.manager.explain_query('email = "ada@example.com"')
+        self.assertEqual(plan[0], "scan employee (7 rows)")
+
+
+class ResultCacheTests(QueryTestCase):
+    """Cached results are bounded and dropped on changes."""
+
+    def test_results_are_invalidated_by_changes(self):
+        self.assertEqual(self.names('role = "QA"'), ["Grace", "Ken", "Dennis"])
+        self.manager.update_employee(2, role="Developer")
+        self.assertEqual(self.names('role = "QA"'), ["Ken", "Dennis"])
+
+    def test_result_cache_is_bounded(self):
+        for number in range(query.RESULT_CACHE_SIZE + 10):
+            self.manager.query(f'id = {number}')
+        engine = self.manager._query_engine()
+        self.assertEqual(len(engine._results), query.RESULT_CACHE_SIZE)
+        self.assertNotIn(('employee', 'id = 0'), engine._results)
+
+        engine.run('id = 10')  # Recently used entries are kept
+        self.manager.query('id = 9999')
+        self.assertIn(('employee', 'id = 10'), engine._results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Tests for the sharded multi-department manager."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from department_manager import DepartmentManager
+from sharding import ShardedDepartmentManager, by_hash
+
+
+class ShardLoadingTests(unittest.TestCase):
+    """Separate department files can be combined into one sharded manager."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.data_dir = Path(self._tmp.name)
+
+    def department(self, key: str, *names: str) -> DepartmentManager:
+        manager = DepartmentManager(str(self.data_dir / f"{key}.json"))
+        project = manager.add_project(f"{key} platform", "Shared tooling", [])
+        for name in names:
+            employee = manager.add_employee(name, "Developer", f"{name.lower()}@example.com", [])
+            manager.assign_to_project(employee.id, project.id)
+        return manager
+
+    def test_colliding_ids_are_renumbered(self):
+        self.department("eng", "Ada")
+        self.department("qa", "Bob", "Cleo")
+
+        sharded = ShardedDepartmentManager(str(self.data_dir))
+        self.assertEqual(sharded.get_employee(1).name, "Ada")
+        ids = {e.name: e.id for e in sharded.list_employees()}
+        self.assertEqual(len(set(ids.values())), 3)
+
+        bob = sharded.get_employee(ids["Bob"])
+        self.assertEqual(bob.name, "Bob")
+        qa_project = sharded.get_project(bob.current_project)
+        self.assertEqual(qa_project.name, "qa platform")
+        self.assertEqual(sorted(e.name for e in sharded.get_project_team(qa_project.id)), ["Bob", "Cleo"])
+        self.assertTrue(sharded.shards["qa"].verify_integrity().ok)
+
+        # The new ids were saved, so a reload routes the same way
+        reloaded = ShardedDepartmentManager(str(self.data_dir))
+        self.assertEqual({e.name: e.id for e in reloaded.list_employees()}, ids)
+
+    def test_new_ids_stay_unique_after_renumbering(self):
+        self.department("eng", "Ada")
+        self.department("qa", "Bob")
+        sharded = ShardedDepartmentManager(str(self.data_dir))
+
+        grace = sharded.add_employee("eng", "Grace", "QA", "grace@example.com", [])
+        self.assertEqual(len({e.id for e in sharded.list_employees()}), 3)
+        self.assertEqual(sharded.get_employee(grace.id).name, "Grace")
+
+    def test_move_employee_between_departments(self):
+        self.department("eng", "Ada")
+        self.department("qa", "Bob")
+        sharded = ShardedDepartmentManager(str(self.data_dir))
+
+        self.assertTrue(sharded.move_employee(1, "qa"))
+        self.assertEqual(sorted(e.name for e in sharded.shards["qa"].list_employees()), ["Ada", "Bob"])
+        self.assertEqual(sharded.shards["eng"].list_employees(), [])
+        self.assertIsNone(sharded.get_employee(1).current_project)
+
+    def test_move_employee_needs_department_shards(self):
+        sharded = ShardedDepartmentManager(str(self.data_dir), partition=by_hash(1))
+        ada = sharded.add_employee("Engineering", "Ada", "Developer", "ada@example.com", [])
+
+        with self.assertRaises(ValueError):
+            sharded.move_employee(ada.id, "Research")
+        self.assertEqual(len(sharded.shards), 1)
+
+    def test_each_shard_has_its_own_changefeed(self):
+        feed = self.data_dir / "feeds" / "changes.jsonl"
+        feed.parent.mkdir()
+        sharded = ShardedDepartmentManager(str(self.data_dir), changefeed=str(feed))
+        sharded.add_employee("Engineering", "Ada", "Developer", "ada@example.com", [])
+        sharded.add_employee("QA", "Bob", "QA", "bob@example.com", [])
+
+        self.assertEqual(sorted(p.name for p in feed.parent.iterdir()),
+                         ["changes.engineering.jsonl", "changes.qa.jsonl"])
+        for key, name in (("engineering", "Ada"), ("qa", "Bob")):
+            events = list(sharded.shards[key].changes.read_since(0))
+            self.assertEqual([(e.seq, e.after["name"]) for e in events], [(1, name)])
+
+
+if __name__ == "__main__":
+    unittest.main()
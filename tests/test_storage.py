@@ -0,0 +1,150 @@
+"""Fault-injection tests for crash-safe saves and backup recovery."""
+
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import storage
+from department_manager import DepartmentManager
+
+
+class CrashSafeSaveTests(unittest.TestCase):
+    """A failed save must leave the previous data file untouched."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.data_file = Path(self._tmp.name) / "department_data.json"
+        self.manager = DepartmentManager(str(self.data_file))
+        self.manager.add_employee("Ada", "Developer", "ada@example.com", ["Python"])
+        self.saved = self.data_file.read_bytes()
+
+    def leftover_temp_files(self) -> list:
+        return [p.name for p in self.data_file.parent.iterdir() if p.suffix == ".tmp"]
+
+    def test_failed_replace_keeps_old_file(self):
+        with mock.patch("storage.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.manager.add_employee("Grace", "QA", "grace@example.com", [])
+
+        self.assertEqual(self.data_file.read_bytes(), self.saved)
+        self.assertEqual(self.leftover_temp_files(), [])
+
+    def test_failed_write_keeps_old_file(self):
+        def failing_chunks():
+            yield '{"next_employee_id": 3, "employees": {'
+            raise OSError("write failed")
+
+        with self.assertRaises(OSError):
+            storage.write_document(self.data_file, failing_chunks())
+
+        self.assertEqual(self.data_file.read_bytes(), self.saved)
+        self.assertEqual(self.leftover_temp_files(), [])
+        self.assertEqual([e.name for e in DepartmentManager(str(self.data_file)).list_employees()], ["Ada"])
+
+    def test_save_keeps_file_mode(self):
+        os.chmod(self.data_file, 0o640)
+        self.manager.add_employee("Grace", "QA", "grace@example.com", [])
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.data_file).st_mode), 0o640)
+
+    def test_new_file_gets_default_mode(self):
+        plain = self.data_file.with_name("plain.json")
+        plain.write_text("{}", encoding="utf-8")
+        data_file = self.data_file.with_name("new.json")
+        storage.write_document(data_file, ["{}"], backups=0)
+
+        self.assertEqual(stat.S_IMODE(os.stat(data_file).st_mode), stat.S_IMODE(os.stat(plain).st_mode))
+
+
+class BackupRecoveryTests(unittest.TestCase):
+    """A damaged data file is replaced by the newest valid backup on load."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.data_file = Path(self._tmp.name) / "department_data.json"
+        manager = DepartmentManager(str(self.data_file))
+        manager.add_employee("Ada", "Developer", "ada@example.com", ["Python"])
+        manager.add_employee("Grace", "QA", "grace@example.com", [])  # Ada-only file is backup 1
+
+    def load_names(self) -> list:
+        manager = DepartmentManager(str(self.data_file))
+        self.assertIsNone(manager.load_error)
+        return [e.name for e in manager.list_employees()]
+
+    def test_intact_file_loads(self):
+        self.assertEqual(self.load_names(), ["Ada", "Grace"])
+
+    def test_checksum_mismatch_loads_backup(self):
+        text = self.data_file.read_text(encoding="utf-8")
+        self.data_file.write_text(text.replace("Grace", "Gracy"), encoding="utf-8")
+
+        with self.assertRaises(storage.ChecksumError):
+            storage._read_verified(self.data_file, None)
+        self.assertEqual(self.load_names(), ["Ada"])
+
+    def test_truncated_file_loads_backup(self):
+        data = self.data_file.read_bytes()
+        self.data_file.write_bytes(data[:len(data) // 2])
+
+        self.assertEqual(self.load_names(), ["Ada"])
+
+    def test_truncated_compressed_file_loads_backup(self):
+        data_file = self.data_file.with_name("department_data.json.gz")
+        manager = DepartmentManager(str(data_file))
+        manager.add_employee("Ada", "Developer", "ada@example.com", ["Python"])
+        manager.add_employee("Grace", "QA", "grace@example.com", [])
+        data = data_file.read_bytes()
+        data_file.write_bytes(data[:len(data) - 20])
+
+        self.assertEqual([e.name for e in DepartmentManager(str(data_file)).list_employees()], ["Ada"])
+
+    def test_no_valid_copy_is_reported(self):
+        for path in [self.data_file] + [storage.backup_path(self.data_file, i) for i in (1, 2, 3)]:
+            if path.exists():
+                path.write_text("{not json", encoding="utf-8")
+
+        manager = DepartmentManager(str(self.data_file))
+        self.assertIsInstance(manager.load_error, storage.ChecksumError)
+        self.assertEqual(manager.list_employees(), [])
+
+
+class DuplicateIdTests(unittest.TestCase):
+    """Records stored twice under the same id are reported, not silently merged."""
+
+    RECORD = '{"id": 1, "name": "%s", "role": "Developer", "email": "x@example.com", "skills": []}'
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def write_duplicates(self, name: str) -> Path:
+        data_file = Path(self._tmp.name) / name
+        body = ('{"next_employee_id": 2, "next_project_id": 1, "employees": {\n'
+                f'"1": {self.RECORD % "Ada"},\n"1": {self.RECORD % "Grace"}}}, "projects": {{}}}}')
+        storage.write_document(data_file, [body], backups=0)
+        return data_file
+
+    def assert_duplicate_reported(self, data_file: Path):
+        manager = DepartmentManager(str(data_file))
+        self.assertEqual([e.name for e in manager.list_employees()], ["Grace"])
+        codes = [(issue.code, issue.entity, issue.entity_id) for issue in manager.verify_integrity().issues]
+        self.assertIn(("duplicate_id", "employee", 1), codes)
+
+        self.assertTrue(manager.repair_integrity().repaired)
+        self.assertTrue(manager.verify_integrity().ok)
+        self.assertTrue(DepartmentManager(str(data_file)).verify_integrity().ok)
+
+    def test_plain_file(self):
+        self.assert_duplicate_reported(self.write_duplicates("department_data.json"))
+
+    def test_compressed_file(self):
+        self.assert_duplicate_reported(self.write_duplicates("department_data.json.gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()